@@ -0,0 +1,63 @@
+"""add: user sessions
+
+Revision ID: 02e5f83111f1
+Revises: 6a27ce5e5dbe
+Create Date: 2026-10-19 11:03:27.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "02e5f83111f1"
+down_revision: Union[str, Sequence[str], None] = "6a27ce5e5dbe"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        "users",
+        "password",
+        existing_type=sa.String(length=100),
+        type_=sa.String(length=255),
+        existing_nullable=True,
+    )
+    op.create_table(
+        "user_sessions",
+        sa.Column("id", sa.String(length=64), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_user_sessions_user_id"), "user_sessions", ["user_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_user_sessions_user_id"), table_name="user_sessions")
+    op.drop_table("user_sessions")
+    op.alter_column(
+        "users",
+        "password",
+        existing_type=sa.String(length=255),
+        type_=sa.String(length=100),
+        existing_nullable=True,
+    )
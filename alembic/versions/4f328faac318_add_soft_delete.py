@@ -0,0 +1,117 @@
+"""add: soft delete
+
+Revision ID: 4f328faac318
+Revises: 519c44a136d3
+Create Date: 2026-10-19 17:05:48.331270
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4f328faac318"
+down_revision: Union[str, Sequence[str], None] = "519c44a136d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LIVE = sa.text("is_active AND deleted_at IS NULL")
+DELETED = sa.text("deleted_at IS NOT NULL")
+
+# (name, table, columns, new options, previous options); None where the
+# index does not exist on that side.
+INDEXES = [
+    (
+        "ix_posts_slug_validators",
+        "posts",
+        ["slug"],
+        {"postgresql_include": ["id", "updated_at"], "postgresql_where": LIVE},
+        {"postgresql_include": ["id", "updated_at", "is_active"]},
+    ),
+    (
+        "ix_posts_active_created_at",
+        "posts",
+        ["created_at"],
+        {"postgresql_include": ["id", "title", "slug"], "postgresql_where": LIVE},
+        {
+            "postgresql_include": ["id", "title", "slug"],
+            "postgresql_where": sa.text("is_active"),
+        },
+    ),
+    (
+        "ix_posts_category_id_created_at",
+        "posts",
+        ["category_id", "created_at"],
+        {"postgresql_include": ["id", "title", "slug"], "postgresql_where": LIVE},
+        {"postgresql_include": ["id", "title", "slug", "is_active"]},
+    ),
+    (
+        "ix_posts_deleted_at",
+        "posts",
+        ["deleted_at"],
+        {"postgresql_where": DELETED},
+        None,
+    ),
+    (
+        "ix_comments_live_post_id_created_at",
+        "comments",
+        ["post_id", "created_at"],
+        {"postgresql_where": LIVE},
+        None,
+    ),
+    # Replaced by the partial index above, which is what queries use.
+    (
+        "ix_comments_post_id_created_at",
+        "comments",
+        ["post_id", "created_at"],
+        None,
+        {},
+    ),
+    (
+        "ix_comments_deleted_at",
+        "comments",
+        ["deleted_at"],
+        {"postgresql_where": DELETED},
+        None,
+    ),
+]
+
+
+def _swap(indexes, use_new: bool):
+    with op.get_context().autocommit_block():
+        for name, table, columns, new, old in indexes:
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
+            options = new if use_new else old
+            if options is not None:
+                op.create_index(
+                    name,
+                    table,
+                    columns,
+                    unique=False,
+                    postgresql_concurrently=True,
+                    **options,
+                )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "posts", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column(
+        "comments", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    _swap(INDEXES, use_new=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _swap(reversed(INDEXES), use_new=False)
+    op.drop_column("comments", "deleted_at")
+    op.drop_column("posts", "deleted_at")
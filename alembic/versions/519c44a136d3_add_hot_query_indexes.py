@@ -0,0 +1,69 @@
+"""add: hot query indexes
+
+Revision ID: 519c44a136d3
+Revises: bff3edea90b2
+Create Date: 2026-10-19 16:21:35.904127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "519c44a136d3"
+down_revision: Union[str, Sequence[str], None] = "bff3edea90b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    (
+        "ix_posts_active_created_at",
+        "posts",
+        ["created_at"],
+        {
+            "postgresql_include": ["id", "title", "slug"],
+            "postgresql_where": sa.text("is_active"),
+        },
+    ),
+    (
+        "ix_posts_category_id_created_at",
+        "posts",
+        ["category_id", "created_at"],
+        {"postgresql_include": ["id", "title", "slug", "is_active"]},
+    ),
+    ("ix_posts_user_id_created_at", "posts", ["user_id", "created_at"], {}),
+    ("ix_comments_post_id_created_at", "comments", ["post_id", "created_at"], {}),
+    ("ix_comments_user_id", "comments", ["user_id"], {}),
+    ("ix_likes_post_id_created_at", "likes", ["post_id", "created_at"], {}),
+    ("ix_likes_device_id", "likes", ["device_id"], {}),
+    ("ix_post_tags_tag_id_post_id", "post_tags", ["tag_id", "post_id"], {}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so writes to these tables are not blocked meanwhile.
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **options,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,51 @@
+"""add: related posts
+
+Revision ID: 5c3061ee2196
+Revises: d84e84157fa0
+Create Date: 2026-10-19 12:26:51.093364
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c3061ee2196"
+down_revision: Union[str, Sequence[str], None] = "d84e84157fa0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "related_posts",
+        sa.Column("post_id", sa.BigInteger(), nullable=False),
+        sa.Column("rank", sa.SmallInteger(), nullable=False),
+        sa.Column("related_post_id", sa.BigInteger(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["post_id"],
+            ["posts.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["related_post_id"],
+            ["posts.id"],
+        ),
+        sa.PrimaryKeyConstraint("post_id", "rank"),
+    )
+    op.create_index(
+        op.f("ix_related_posts_related_post_id"),
+        "related_posts",
+        ["related_post_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_related_posts_related_post_id"), table_name="related_posts")
+    op.drop_table("related_posts")
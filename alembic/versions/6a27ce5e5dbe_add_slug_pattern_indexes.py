@@ -0,0 +1,36 @@
+"""add: slug pattern indexes
+
+Revision ID: 6a27ce5e5dbe
+Revises: 3938d04e758b
+Create Date: 2026-10-19 10:12:41.204518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6a27ce5e5dbe"
+down_revision: Union[str, Sequence[str], None] = "3938d04e758b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("posts", "tags", "categories"):
+        op.create_index(
+            f"ix_{table}_slug_pattern",
+            table,
+            ["slug"],
+            unique=False,
+            postgresql_ops={"slug": "varchar_pattern_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("categories", "tags", "posts"):
+        op.drop_index(f"ix_{table}_slug_pattern", table_name=table)
@@ -0,0 +1,73 @@
+"""add: device key
+
+Revision ID: aa94c6767fbe
+Revises: 4f328faac318
+Create Date: 2026-10-19 17:31:12.604518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "aa94c6767fbe"
+down_revision: Union[str, Sequence[str], None] = "4f328faac318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("devices", sa.Column("device_key", sa.String(64), nullable=True))
+    # Existing devices have no client token, so they get keys no client
+    # will ever present; their clients are assigned new devices.
+    op.execute(
+        "UPDATE devices SET device_key = "
+        "encode(sha256(convert_to(id::text || ':' || user_agent, 'UTF8')), 'hex')"
+    )
+    op.alter_column("devices", "device_key", nullable=False)
+
+    # Keep the earliest like of each (post, device) pair.
+    op.execute(
+        "DELETE FROM likes a USING likes b "
+        "WHERE a.post_id = b.post_id AND a.device_id = b.device_id AND a.id > b.id"
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_devices_device_key",
+            "devices",
+            ["device_key"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_likes_post_id_device_id",
+            "likes",
+            ["post_id", "device_id"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_likes_post_id_device_id",
+            table_name="likes",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_devices_device_key",
+            table_name="devices",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("devices", "device_key")
@@ -0,0 +1,56 @@
+"""add: author stats
+
+Revision ID: b201e011df06
+Revises: dab05f428204
+Create Date: 2026-10-19 18:40:09.771354
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b201e011df06"
+down_revision: Union[str, Sequence[str], None] = "dab05f428204"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+METRICS = ("posts", "views", "likes", "comments")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW author_stats AS
+        SELECT
+            p.user_id,
+            count(*) AS posts,
+            coalesce(sum(p.views_count), 0)::bigint AS views,
+            coalesce(sum(p.likes_count), 0)::bigint AS likes,
+            coalesce(sum(c.n), 0)::bigint AS comments
+        FROM posts p
+        LEFT JOIN (
+            SELECT post_id, count(*) AS n FROM comments
+            WHERE is_active AND deleted_at IS NULL
+            GROUP BY post_id
+        ) c ON c.post_id = p.id
+        WHERE p.is_active AND p.deleted_at IS NULL AND p.user_id IS NOT NULL
+        GROUP BY p.user_id
+    """)
+    # The unique index is what REFRESH ... CONCURRENTLY requires.
+    op.create_index("ix_author_stats_user_id", "author_stats", ["user_id"], unique=True)
+    for metric in METRICS:
+        op.create_index(
+            f"ix_author_stats_{metric}",
+            "author_stats",
+            [sa.text(f"{metric} DESC"), "user_id"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW author_stats")
@@ -0,0 +1,42 @@
+"""add: new post notify trigger
+
+Revision ID: bff3edea90b2
+Revises: f8db53f1d18a
+Create Date: 2026-10-19 15:40:52.118304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "bff3edea90b2"
+down_revision: Union[str, Sequence[str], None] = "f8db53f1d18a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE FUNCTION notify_new_post() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('new_posts', NEW.id::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER posts_notify_new_post
+        AFTER INSERT ON posts
+        FOR EACH ROW WHEN (NEW.is_active)
+        EXECUTE FUNCTION notify_new_post()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER posts_notify_new_post ON posts")
+    op.execute("DROP FUNCTION notify_new_post()")
@@ -0,0 +1,130 @@
+"""add: post counts
+
+Revision ID: dab05f428204
+Revises: aa94c6767fbe
+Create Date: 2026-10-19 18:02:47.215903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "dab05f428204"
+down_revision: Union[str, Sequence[str], None] = "aa94c6767fbe"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("categories", "tags"):
+        op.add_column(
+            table,
+            sa.Column("post_count", sa.Integer(), server_default="0", nullable=False),
+        )
+
+    # A post counts while it is live (is_active AND deleted_at IS NULL).
+    op.execute("""
+        CREATE FUNCTION count_post_change() RETURNS trigger AS $$
+        DECLARE
+            was_live boolean := false;
+            is_live boolean := false;
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                was_live := coalesce(OLD.is_active AND OLD.deleted_at IS NULL, false);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                is_live := coalesce(NEW.is_active AND NEW.deleted_at IS NULL, false);
+            END IF;
+            IF was_live THEN
+                UPDATE categories SET post_count = post_count - 1
+                WHERE id = OLD.category_id;
+                UPDATE tags SET post_count = tags.post_count - 1
+                FROM post_tags pt
+                WHERE pt.post_id = OLD.id AND tags.id = pt.tag_id;
+            END IF;
+            IF is_live THEN
+                UPDATE categories SET post_count = post_count + 1
+                WHERE id = NEW.category_id;
+                UPDATE tags SET post_count = tags.post_count + 1
+                FROM post_tags pt
+                WHERE pt.post_id = NEW.id AND tags.id = pt.tag_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER posts_count_insert_delete
+        AFTER INSERT OR DELETE ON posts
+        FOR EACH ROW EXECUTE FUNCTION count_post_change()
+    """)
+    # Only fires when liveness or category changes, so counter flushes
+    # (views_count, likes_count) do not pay for it.
+    op.execute("""
+        CREATE TRIGGER posts_count_update
+        AFTER UPDATE OF is_active, deleted_at, category_id ON posts
+        FOR EACH ROW WHEN (
+            (OLD.is_active AND OLD.deleted_at IS NULL)
+                IS DISTINCT FROM (NEW.is_active AND NEW.deleted_at IS NULL)
+            OR OLD.category_id IS DISTINCT FROM NEW.category_id
+        )
+        EXECUTE FUNCTION count_post_change()
+    """)
+
+    op.execute("""
+        CREATE FUNCTION count_post_tag_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE tags SET post_count = post_count + 1
+                WHERE id = NEW.tag_id AND EXISTS (
+                    SELECT 1 FROM posts
+                    WHERE id = NEW.post_id AND is_active AND deleted_at IS NULL
+                );
+            ELSE
+                UPDATE tags SET post_count = post_count - 1
+                WHERE id = OLD.tag_id AND EXISTS (
+                    SELECT 1 FROM posts
+                    WHERE id = OLD.post_id AND is_active AND deleted_at IS NULL
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER post_tags_count
+        AFTER INSERT OR DELETE ON post_tags
+        FOR EACH ROW EXECUTE FUNCTION count_post_tag_change()
+    """)
+
+    op.execute("""
+        UPDATE categories SET post_count = n.count FROM (
+            SELECT category_id, count(*) FROM posts
+            WHERE is_active AND deleted_at IS NULL
+            GROUP BY category_id
+        ) n WHERE categories.id = n.category_id
+    """)
+    op.execute("""
+        UPDATE tags SET post_count = n.count FROM (
+            SELECT pt.tag_id, count(*) FROM post_tags pt
+            JOIN posts p ON p.id = pt.post_id
+            WHERE p.is_active AND p.deleted_at IS NULL
+            GROUP BY pt.tag_id
+        ) n WHERE tags.id = n.tag_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER post_tags_count ON post_tags")
+    op.execute("DROP FUNCTION count_post_tag_change()")
+    op.execute("DROP TRIGGER posts_count_update ON posts")
+    op.execute("DROP TRIGGER posts_count_insert_delete ON posts")
+    op.execute("DROP FUNCTION count_post_change()")
+    op.drop_column("tags", "post_count")
+    op.drop_column("categories", "post_count")
@@ -0,0 +1,37 @@
+"""add: rendered post content
+
+Revision ID: e124c39152d7
+Revises: ec3c86958780
+Create Date: 2026-10-19 19:48:21.603114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e124c39152d7"
+down_revision: Union[str, Sequence[str], None] = "ec3c86958780"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled in by `python -m services.content`; rendering is Python-side.
+    op.add_column("posts", sa.Column("body_html", sa.Text(), nullable=True))
+    op.add_column("posts", sa.Column("excerpt", sa.Text(), nullable=True))
+    op.add_column(
+        "posts",
+        sa.Column("word_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("posts", "word_count")
+    op.drop_column("posts", "excerpt")
+    op.drop_column("posts", "body_html")
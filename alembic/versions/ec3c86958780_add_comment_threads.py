@@ -0,0 +1,92 @@
+"""add: comment threads
+
+Revision ID: ec3c86958780
+Revises: b201e011df06
+Create Date: 2026-10-19 19:12:30.418822
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ec3c86958780"
+down_revision: Union[str, Sequence[str], None] = "b201e011df06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("comments", sa.Column("device_id", sa.BigInteger(), nullable=True))
+    op.add_column("comments", sa.Column("parent_id", sa.BigInteger(), nullable=True))
+    op.add_column(
+        "comments", sa.Column("path", sa.String(collation="C"), nullable=True)
+    )
+    op.add_column(
+        "comments",
+        sa.Column("depth", sa.SmallInteger(), server_default="0", nullable=False),
+    )
+    op.create_foreign_key(
+        "comments_device_id_fkey", "comments", "devices", ["device_id"], ["id"]
+    )
+    op.create_foreign_key(
+        "comments_parent_id_fkey",
+        "comments",
+        "comments",
+        ["parent_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+    # Existing comments become thread roots.
+    op.execute("UPDATE comments SET path = lpad(id::text, 12, '0')")
+    op.alter_column("comments", "path", nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_comments_live_post_id_created_at",
+            table_name="comments",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.create_index(
+            "ix_comments_live_post_id_path",
+            "comments",
+            ["post_id", "path"],
+            unique=False,
+            # The depth limit is checked in the index, without heap fetches.
+            postgresql_include=["depth"],
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("is_active AND deleted_at IS NULL"),
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_comments_live_post_id_path",
+            table_name="comments",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.create_index(
+            "ix_comments_live_post_id_created_at",
+            "comments",
+            ["post_id", "created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("is_active AND deleted_at IS NULL"),
+            if_not_exists=True,
+        )
+    op.drop_constraint("comments_parent_id_fkey", "comments", type_="foreignkey")
+    op.drop_constraint("comments_device_id_fkey", "comments", type_="foreignkey")
+    op.drop_column("comments", "depth")
+    op.drop_column("comments", "path")
+    op.drop_column("comments", "parent_id")
+    op.drop_column("comments", "device_id")
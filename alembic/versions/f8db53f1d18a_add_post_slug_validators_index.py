@@ -0,0 +1,34 @@
+"""add: post slug validators index
+
+Revision ID: f8db53f1d18a
+Revises: 5c3061ee2196
+Create Date: 2026-10-19 15:02:17.583920
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f8db53f1d18a"
+down_revision: Union[str, Sequence[str], None] = "5c3061ee2196"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_posts_slug_validators",
+        "posts",
+        ["slug"],
+        unique=False,
+        postgresql_include=["id", "updated_at", "is_active"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_posts_slug_validators", table_name="posts")
@@ -0,0 +1,122 @@
+"""Compare CPU cost and bytes saved for gzip/brotli levels on typical payloads.
+
+python -m benchmarks.compression --runs 200
+python -m benchmarks.compression --from-db   # sample real post bodies
+"""
+
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+
+from services import compression
+
+
+WORDS = (
+    "chesnok sarguzasht kitob yangilik maqola dastur shahar ob-havo bugun "
+    "ertaga yozuvchi o'quvchi muhokama savol javob tarix sport texnologiya"
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def synthetic_payloads(seed: int = 0) -> dict[str, bytes]:
+    rng = random.Random(seed)
+    post = {
+        "id": 1,
+        "title": _text(rng, 8),
+        "slug": "chesnok-sarguzasht",
+        "body": _text(rng, 1500),
+    }
+    listing = [
+        {"id": i, "title": _text(rng, 8), "slug": f"post-{i}", "created_at": ""}
+        for i in range(50)
+    ]
+    categories = [{"id": i, "name": _text(rng, 2)} for i in range(30)]
+    return {
+        "post_detail": json.dumps(post).encode(),
+        "post_list": json.dumps(listing).encode(),
+        "category_list": json.dumps(categories).encode(),
+        "small": json.dumps({"id": 1, "name": "chesnok"}).encode(),
+    }
+
+
+def db_payloads(limit: int) -> dict[str, bytes]:
+    from sqlalchemy import select
+
+    from database import SessionLocal
+    from models import Post
+
+    stmt = (
+        select(Post.id, Post.title, Post.slug, Post.body)
+        .order_by(Post.id.desc())
+        .limit(limit)
+    )
+    with SessionLocal() as session:
+        rows = session.execute(stmt).all()
+    return {f"post_{row.id}": json.dumps(row._asdict()).encode() for row in rows}
+
+
+def codecs() -> dict[str, callable]:
+    result = {
+        f"gzip-{level}": lambda body, level=level: gzip.compress(
+            body, compresslevel=level, mtime=0
+        )
+        for level in (1, 6, 9)
+    }
+    if compression.brotli is not None:
+        for quality in (1, 5, 11):
+            result[f"br-{quality}"] = lambda body, quality=quality: (
+                compression.brotli.compress(body, quality=quality)
+            )
+    return result
+
+
+def measure(body: bytes, codec, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        compressed = codec(body)
+        samples.append(time.perf_counter() - started)
+
+    cpu_us = statistics.median(samples) * 1e6
+    saved = len(body) - len(compressed)
+    return {
+        "bytes": len(compressed),
+        "ratio": round(len(compressed) / len(body), 3),
+        "cpu_us": round(cpu_us, 1),
+        "saved_bytes_per_cpu_ms": round(saved / cpu_us * 1000) if cpu_us else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--from-db", action="store_true")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = db_payloads(args.limit) if args.from_db else synthetic_payloads()
+    result = {
+        "min_size": compression.COMPRESSION_MIN_SIZE,
+        "payloads": {
+            name: {
+                "bytes": len(body),
+                "compressed": len(body) >= compression.COMPRESSION_MIN_SIZE,
+                "codecs": {
+                    codec_name: measure(body, codec, args.runs)
+                    for codec_name, codec in codecs().items()
+                },
+            }
+            for name, body in payloads.items()
+        },
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
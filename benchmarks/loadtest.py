@@ -0,0 +1,134 @@
+"""Closed-loop HTTP load generator for a running server.
+
+python -m benchmarks.loadtest --url http://127.0.0.1:8000 --concurrency 50 --duration 30
+python -m benchmarks.loadtest --path /posts/trending/ --path /tag/list/
+
+Each of --concurrency clients sends requests back to back, picking paths
+round-robin, for --duration seconds after --warmup seconds of unrecorded
+traffic. Prints per-path throughput, latency percentiles and status codes,
+and exits 1 if any path answered with errors: the figures would then
+measure error responses, not the endpoint.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+
+DEFAULT_PATHS = ["/posts/?limit=20", "/category/list/", "/info/weather/"]
+
+
+def _is_error(status: str) -> bool:
+    return not (status.startswith("2") or status == "304")
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+async def _client(client, paths, deadline, record_after, latencies, statuses):
+    for path in itertools.cycle(paths):
+        started = time.perf_counter()
+        if started >= deadline:
+            return
+        try:
+            response = await client.get(path)
+            status = str(response.status_code)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        if started >= record_after:
+            latencies[path].append(time.perf_counter() - started)
+            statuses[path][status] += 1
+
+
+async def run(
+    url: str, paths: list[str], concurrency: int, duration: float, warmup: float
+) -> dict:
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    limits = httpx.Limits(max_connections=concurrency)
+    headers = {"Accept-Encoding": "gzip, br"}
+
+    async with httpx.AsyncClient(
+        base_url=url, limits=limits, headers=headers, timeout=30
+    ) as client:
+        now = time.perf_counter()
+        record_after, deadline = now + warmup, now + warmup + duration
+        # Offset each client's starting path so all paths are hit evenly.
+        await asyncio.gather(
+            *(
+                _client(
+                    client,
+                    paths[i % len(paths) :] + paths[: i % len(paths)],
+                    deadline,
+                    record_after,
+                    latencies,
+                    statuses,
+                )
+                for i in range(concurrency)
+            )
+        )
+
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "duration_seconds": duration,
+        "total_rps": round(sum(len(v) for v in latencies.values()) / duration, 1),
+        "paths": {
+            path: {
+                "requests": len(latencies[path]),
+                "rps": round(len(latencies[path]) / duration, 1),
+                "mean_ms": round(statistics.fmean(latencies[path]) * 1000, 2)
+                if latencies[path]
+                else None,
+                "p50_ms": round(_percentile(latencies[path], 50) * 1000, 2),
+                "p95_ms": round(_percentile(latencies[path], 95) * 1000, 2),
+                "p99_ms": round(_percentile(latencies[path], 99) * 1000, 2),
+                "statuses": dict(statuses[path]),
+                "errors": sum(
+                    n for status, n in statuses[path].items() if _is_error(status)
+                ),
+            }
+            for path in paths
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run(
+            args.url,
+            args.paths or DEFAULT_PATHS,
+            args.concurrency,
+            args.duration,
+            args.warmup,
+        )
+    )
+    print(json.dumps(result, indent=2))
+
+    failing = [path for path, stats in result["paths"].items() if stats["errors"]]
+    if failing:
+        print(f"error responses from: {', '.join(failing)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Query plan regression check for the hot queries issued by the routers.
+
+python -m benchmarks.seed --scale 1m --truncate
+python -m benchmarks.plans            # exits 1 on a violation
+python -m benchmarks.plans --analyze  # EXPLAIN ANALYZE, with timings
+
+Every query is planned with EXPLAIN (FORMAT JSON). A sequential scan of one
+of the large tables, or a sort over more than SORT_ROW_LIMIT input rows, is
+a violation. Small databases make seq scans the cheapest plan, so run it on
+a seeded dataset; a warning is printed below MIN_POSTS posts.
+"""
+
+import argparse
+import json
+import sys
+
+from sqlalchemy import func, select, text
+
+from database import SessionLocal
+from models import Comment, Post, UserSession, live_rows, post_tag_m2m_table
+from routers import comments, posts
+from services import feeds, post_cache, related
+from services.auth import session_user_statement
+from services.fields import projection
+
+
+LARGE_TABLES = {
+    "posts",
+    "comments",
+    "likes",
+    "post_tags",
+    "users",
+    "devices",
+    "related_posts",
+    "user_sessions",
+    "reading_histories",
+}
+SORT_ROW_LIMIT = 1000
+MIN_POSTS = 100_000
+
+# The columns a list endpoint reads when no ``fields=`` is given.
+_list_columns = projection(None, posts.POST_LIST_FIELDS, posts.POST_LIST_DEFAULT_FIELDS)
+
+
+def _samples(session) -> dict:
+    """Representative parameters: popular and rare tags, a reply thread, ..."""
+    tags = (
+        select(post_tag_m2m_table.c.tag_id, func.count().label("n"))
+        .group_by(post_tag_m2m_table.c.tag_id)
+        .subquery()
+    )
+    popular_tag = session.scalar(select(tags.c.tag_id).order_by(tags.c.n.desc()))
+    rare_tag = session.scalar(select(tags.c.tag_id).order_by(tags.c.n))
+    post = session.execute(
+        select(Post.id, Post.slug, Post.category_id)
+        .where(Post.is_active.is_(True))
+        .order_by(Post.id.desc())
+        .limit(1)
+    ).first()
+    if post is None:
+        raise SystemExit("database is empty, run benchmarks.seed first")
+    reply = session.execute(
+        select(Comment.post_id, Comment.parent_id)
+        .where(Comment.parent_id.is_not(None))
+        .order_by(Comment.id.desc())
+        .limit(1)
+    ).first()
+    session_id = session.scalar(select(UserSession.id).limit(1))
+
+    post_ids = list(range(max(1, post.id - 50), post.id + 1))
+    return {
+        "popular_tag": popular_tag,
+        "rare_tag": rare_tag,
+        "post_id": post.id,
+        "slug": post.slug,
+        "category_id": post.category_id,
+        "post_ids": post_ids,
+        "slugs": session.scalars(select(Post.slug).where(Post.id.in_(post_ids))).all(),
+        "thread_post_id": reply.post_id if reply else post.id,
+        "thread_parent_id": reply.parent_id if reply else None,
+        "session_id": session_id or "0" * 32,
+    }
+
+
+def _post_list(category_id=None, tag_id=None):
+    return posts.post_list_statement(
+        _list_columns, category_id, tag_id, 0, posts.POST_PAGE_SIZE
+    )
+
+
+def _comments_page(post_id, parent_id=None):
+    return comments.page_statement(
+        post_id,
+        parent_id,
+        None,
+        comments.COMMENT_DEFAULT_DEPTH,
+        comments.COMMENT_PAGE_SIZE,
+    )
+
+
+# Each entry is the statement the router or service issues, from the same
+# builder, so a change to a query is planned here as well.
+HOT_QUERIES = {
+    "post_list": lambda p: _post_list(),
+    "post_list_by_category": lambda p: _post_list(category_id=p["category_id"]),
+    "post_list_by_popular_tag": lambda p: _post_list(tag_id=p["popular_tag"]),
+    "post_list_by_rare_tag": lambda p: _post_list(tag_id=p["rare_tag"]),
+    "feed_category": lambda p: feeds.build_statement("category", p["category_id"]),
+    "feed_popular_tag": lambda p: feeds.build_statement("tag", p["popular_tag"]),
+    "feed_rare_tag": lambda p: feeds.build_statement("tag", p["rare_tag"]),
+    "post_batch_ids": lambda p: post_cache.BY_IDS.params(ids=p["post_ids"]),
+    "post_batch_slugs": lambda p: post_cache.BY_SLUGS.params(slugs=p["slugs"]),
+    "post_detail_validators": lambda p: posts.validators_statement(p["slug"]),
+    # What session.get(Post, id) issues on an identity map miss.
+    "post_detail": lambda p: select(Post).where(Post.id == p["post_id"]),
+    "related_posts": lambda p: posts.related_statement(p["slug"], _list_columns),
+    "reading_history_posts": lambda p: posts.history_statement(p["post_ids"]),
+    "comments_page": lambda p: _comments_page(p["thread_post_id"]),
+    "comments_subtree": lambda p: _comments_page(
+        p["thread_post_id"], p["thread_parent_id"]
+    ),
+    "related_features_posts": lambda p: related.feature_statements(p["post_ids"])[0],
+    "related_features_tags": lambda p: related.feature_statements(p["post_ids"])[1],
+    "related_features_likes": lambda p: related.feature_statements(p["post_ids"])[2],
+    "session_user": lambda p: session_user_statement(p["session_id"]),
+}
+
+
+def violations(plan: dict) -> list[str]:
+    found = []
+    node_type = plan["Node Type"]
+    relation = plan.get("Relation Name")
+
+    if node_type == "Seq Scan" and relation in LARGE_TABLES:
+        found.append(f"Seq Scan on {relation}")
+    if node_type == "Sort":
+        rows = max((child["Plan Rows"] for child in plan.get("Plans", [])), default=0)
+        if rows > SORT_ROW_LIMIT:
+            found.append(f"Sort over ~{rows} rows ({', '.join(plan['Sort Key'])})")
+
+    for child in plan.get("Plans", []):
+        found.extend(violations(child))
+    return found
+
+
+def explain(session, stmt, analyze: bool = False) -> dict:
+    # exec_driver_sql bypasses the session's live-row filter, so add it here.
+    compiled = stmt.options(*live_rows()).compile(
+        dialect=session.bind.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    connection = session.connection()
+    result = connection.exec_driver_sql(
+        f"EXPLAIN ({options}) {compiled}", compiled.params
+    )
+    return result.scalar()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--query", action="append", choices=HOT_QUERIES)
+    parser.add_argument("--analyze", action="store_true")
+    parser.add_argument("--show-plans", action="store_true")
+    args = parser.parse_args()
+
+    result = {}
+    failed = False
+    with SessionLocal() as session:
+        posts = session.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'posts'")
+        )
+        if posts < MIN_POSTS:
+            print(
+                f"warning: posts has ~{posts} rows, plans may differ from production",
+                file=sys.stderr,
+            )
+
+        params = _samples(session)
+        for name in args.query or HOT_QUERIES:
+            explained = explain(session, HOT_QUERIES[name](params), args.analyze)
+            plan = explained["Plan"]
+            problems = violations(plan)
+            failed = failed or bool(problems)
+
+            entry = {"ok": not problems, "violations": problems}
+            entry["total_cost"] = plan["Total Cost"]
+            if args.analyze:
+                entry["execution_ms"] = explained["Execution Time"]
+            if args.show_plans:
+                entry["plan"] = plan
+            result[name] = entry
+        session.rollback()
+
+    print(json.dumps(result, indent=2, default=str))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Scenario benchmarks against a seeded database (see benchmarks/seed.py).
+
+python -m benchmarks.run --iterations 200 --output results.json
+python -m benchmarks.run --compare results.json --threshold 1.25
+
+The read scenarios go through the routers' own statement builders, feeds
+and post cache, as the endpoints do; likes_ingestion and trending_refresh
+load the likes table and rerun the trending job. Parameters are drawn from
+a seeded RNG, so runs are comparable. With --compare, p95 latencies are
+checked against a previous result file and the exit code is 1 when any
+scenario regressed by more than --threshold.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from database import SessionLocal, engine
+from models import Like, Post
+from routers import comments, posts
+from services import post_cache, trending
+from services.fields import projection
+
+
+LIKES_BATCH = 1000
+BATCH_SIZE = 20
+
+# The columns a list endpoint reads when no ``fields=`` is given.
+_list_columns = projection(None, posts.POST_LIST_FIELDS, posts.POST_LIST_DEFAULT_FIELDS)
+
+
+class Context:
+    """Table bounds, read once so scenarios can pick valid random ids."""
+
+    def __init__(self, session):
+        self.max_post = session.scalar(select(func.max(Post.id))) or 0
+        self.max_tag = session.scalar(text("SELECT max(id) FROM tags")) or 0
+        self.max_category = session.scalar(text("SELECT max(id) FROM categories")) or 0
+        self.max_device = session.scalar(text("SELECT max(id) FROM devices")) or 0
+        if not self.max_post:
+            raise SystemExit("database is empty, run benchmarks.seed first")
+
+        step = max(1, self.max_post // 1000)
+        self.slugs = session.scalars(
+            select(Post.slug).where(Post.id % step == 0).order_by(Post.id).limit(1000)
+        ).all()
+
+
+def _post_list(session, category_id=None, tag_id=None, offset=0):
+    # The same path as GET /posts/: the feed when it covers the page, else
+    # the list statement.
+    found = posts.feed_page(
+        session, _list_columns, category_id, tag_id, offset, posts.POST_PAGE_SIZE
+    )
+    if found is not None:
+        return found
+    stmt = posts.post_list_statement(
+        _list_columns, category_id, tag_id, offset, posts.POST_PAGE_SIZE
+    )
+    return session.execute(stmt).all()
+
+
+def feed_listing(session, ctx: Context, rng: random.Random):
+    page = min(int(rng.expovariate(0.5)), 50)
+    return _post_list(session, offset=page * posts.POST_PAGE_SIZE)
+
+
+def category_filtering(session, ctx: Context, rng: random.Random):
+    page = min(int(rng.expovariate(0.5)), 50)
+    return _post_list(
+        session,
+        category_id=rng.randint(1, ctx.max_category),
+        offset=page * posts.POST_PAGE_SIZE,
+    )
+
+
+def tag_filtering(session, ctx: Context, rng: random.Random):
+    return _post_list(session, tag_id=rng.randint(1, ctx.max_tag))
+
+
+def single_post(session, ctx: Context, rng: random.Random):
+    stmt = posts.validators_statement(rng.choice(ctx.slugs))
+    validators = session.execute(stmt).first()
+    return session.get(Post, validators.id) if validators else None
+
+
+def post_batch(session, ctx: Context, rng: random.Random):
+    return post_cache.get_many(
+        session, [rng.randint(1, ctx.max_post) for _ in range(BATCH_SIZE)]
+    )
+
+
+def comment_thread(session, ctx: Context, rng: random.Random):
+    stmt = comments.page_statement(
+        rng.randint(1, ctx.max_post),
+        None,
+        None,
+        comments.COMMENT_DEFAULT_DEPTH,
+        comments.COMMENT_PAGE_SIZE,
+    )
+    return session.execute(stmt).scalars().all()
+
+
+def likes_ingestion(session, ctx: Context, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "post_id": rng.randint(1, ctx.max_post),
+            "device_id": rng.randint(1, ctx.max_device),
+            "created_at": now,
+        }
+        for _ in range(LIKES_BATCH)
+    ]
+    # run_scenario rolls back after every iteration, so reruns see the same data.
+    session.execute(insert(Like).on_conflict_do_nothing(), rows)
+
+
+def trending_refresh(session, ctx: Context, rng: random.Random):
+    return trending.refresh()
+
+
+SCENARIOS = {
+    "feed_listing": feed_listing,
+    "category_filtering": category_filtering,
+    "tag_filtering": tag_filtering,
+    "single_post": single_post,
+    "post_batch": post_batch,
+    "comment_thread": comment_thread,
+    "likes_ingestion": likes_ingestion,
+    "trending_refresh": trending_refresh,
+}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def run_scenario(name: str, iterations: int, warmup: int, seed: int) -> dict:
+    scenario = SCENARIOS[name]
+    rng = random.Random(f"{seed}:{name}")
+    samples = []
+    with SessionLocal() as session:
+        ctx = Context(session)
+        for i in range(warmup + iterations):
+            started = time.perf_counter()
+            scenario(session, ctx, rng)
+            elapsed = time.perf_counter() - started
+            session.rollback()
+            session.expunge_all()
+            if i >= warmup:
+                samples.append(elapsed * 1000)
+
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "ops_per_sec": round(1000 / statistics.fmean(samples), 1),
+    }
+
+
+def _environment() -> dict:
+    with engine.connect() as conn:
+        counts = dict(
+            conn.execute(
+                text(
+                    "SELECT relname, reltuples::bigint FROM pg_class "
+                    "WHERE relkind = 'r' AND relname = ANY(:tables)"
+                ),
+                {
+                    "tables": [
+                        "users",
+                        "posts",
+                        "tags",
+                        "post_tags",
+                        "categories",
+                        "likes",
+                        "comments",
+                    ]
+                },
+            ).all()
+        )
+        server = conn.execute(text("SHOW server_version")).scalar()
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "postgres": server,
+        "rows": counts,
+    }
+
+
+def compare(result: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, current in result["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not previous["p95_ms"]:
+            continue
+        ratio = current["p95_ms"] / previous["p95_ms"]
+        current["p95_vs_baseline"] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append(f"{name}: p95 {ratio:.2f}x baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    parser.add_argument("--compare", metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    result = {
+        "environment": _environment(),
+        "scenarios": {
+            name: run_scenario(name, args.iterations, args.warmup, args.seed)
+            for name in args.scenario or SCENARIOS
+        },
+    }
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        result["regressions"] = regressions
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
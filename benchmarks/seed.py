@@ -0,0 +1,374 @@
+"""Deterministic dataset generator for benchmarks.
+
+python -m benchmarks.seed --scale 100k --truncate
+python -m benchmarks.seed --rows 2500000 --seed 7 --truncate
+
+The same --scale/--rows and --seed always produce identical rows. Tables
+are bulk loaded with COPY into an empty database (or one emptied with
+--truncate), then sequences and denormalized counters are fixed up and the
+tables analyzed. Never point this at a database you care about.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from database import engine
+
+
+SCALES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+# Rows per post for every other table; 10.6 rows in total per post.
+USERS_PER_POST = 0.1
+DEVICES_PER_POST = 0.5
+TAGS_PER_POST = 3
+LIKES_PER_POST = 4
+COMMENTS_PER_POST = 2
+REPLY_RATIO = 0.5
+REPLY_MAX_DEPTH = 5
+CATEGORIES = 30
+TAGS = 500
+
+COPY_CHUNK_ROWS = 50_000
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HISTORY_DAYS = 365
+
+WORDS = (
+    "chesnok sarguzasht kitob yangilik maqola dastur shahar ob-havo bugun "
+    "ertaga yozuvchi o'quvchi muhokama savol javob tarix sport texnologiya "
+    "fan san'at musiqa kino sayohat taom salomatlik ta'lim iqtisod siyosat "
+    "bozor narx internet telefon kompyuter dasturchi python baza server"
+).split()
+
+TABLES = [
+    "comments",
+    "likes",
+    "post_tags",
+    "posts",
+    "tags",
+    "categories",
+    "devices",
+    "users",
+]
+
+
+@dataclass
+class Plan:
+    seed: int
+    users: int
+    categories: int
+    tags: int
+    posts: int
+    post_tags: int
+    devices: int
+    likes: int
+    comments: int
+    body_words: int
+
+    @classmethod
+    def for_rows(cls, rows: int, seed: int = 0, body_words: int = 200):
+        per_post = (
+            1
+            + USERS_PER_POST
+            + DEVICES_PER_POST
+            + TAGS_PER_POST
+            + LIKES_PER_POST
+            + COMMENTS_PER_POST
+        )
+        posts = max(100, int(rows / per_post))
+        return cls(
+            seed=seed,
+            users=max(10, int(posts * USERS_PER_POST)),
+            categories=CATEGORIES,
+            tags=TAGS,
+            posts=posts,
+            post_tags=posts * TAGS_PER_POST,
+            devices=max(LIKES_PER_POST, int(posts * DEVICES_PER_POST)),
+            likes=posts * LIKES_PER_POST,
+            comments=posts * COMMENTS_PER_POST,
+            body_words=body_words,
+        )
+
+
+def _rng(plan: Plan, table: str) -> random.Random:
+    # One stream per table, so changing one generator leaves the others alone.
+    return random.Random(f"{plan.seed}:{table}")
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choices(WORDS, k=count))
+
+
+def _timestamp(rng: random.Random) -> str:
+    offset = rng.random() ** 2 * HISTORY_DAYS  # skewed towards recent days
+    return (EPOCH - timedelta(days=offset)).isoformat()
+
+
+def gen_users(plan: Plan):
+    rng = _rng(plan, "users")
+    for i in range(1, plan.users + 1):
+        created = _timestamp(rng)
+        yield (
+            i,
+            f"user{i}@example.com",
+            f"User {i}",
+            0,
+            0,
+            True,
+            False,
+            False,
+            False,
+            created,
+            created,
+        )
+
+
+def gen_categories(plan: Plan):
+    for i in range(1, plan.categories + 1):
+        yield (i, f"Category {i}", f"category-{i}", EPOCH.isoformat())
+
+
+def gen_tags(plan: Plan):
+    for i in range(1, plan.tags + 1):
+        yield (i, f"tag {i}", f"tag-{i}", EPOCH.isoformat())
+
+
+def gen_posts(plan: Plan):
+    rng = _rng(plan, "posts")
+    for i in range(1, plan.posts + 1):
+        title = _words(rng, rng.randint(3, 9))
+        slug = "-".join(title.replace("'", "").split())[:80]
+        words = max(20, int(rng.gauss(plan.body_words, plan.body_words / 3)))
+        created = _timestamp(rng)
+        yield (
+            i,
+            rng.randint(1, plan.users),
+            title,
+            f"{slug}-{i}",
+            _words(rng, words),
+            # Popular categories get most posts.
+            min(plan.categories, int(rng.paretovariate(1.2))),
+            int(rng.paretovariate(1.1) * 10),
+            0,
+            0,
+            max(1, words // 200),
+            rng.random() > 0.05,
+            created,
+            created,
+        )
+
+
+def gen_post_tags(plan: Plan):
+    rng = _rng(plan, "post_tags")
+    for post_id in range(1, plan.posts + 1):
+        tags = set()
+        while len(tags) < TAGS_PER_POST:
+            tags.add(min(plan.tags, int(rng.paretovariate(1.0))))
+        for tag_id in sorted(tags):
+            yield (post_id, tag_id)
+
+
+def gen_devices(plan: Plan):
+    rng = _rng(plan, "devices")
+    agents = ["Mozilla/5.0 (Android)", "Mozilla/5.0 (iPhone)", "Mozilla/5.0 (X11)"]
+    for i in range(1, plan.devices + 1):
+        key = hashlib.sha256(f"seed-{i}".encode()).hexdigest()
+        yield (i, key, f"{rng.choice(agents)} #{i}", _timestamp(rng))
+
+
+def gen_likes(plan: Plan):
+    rng = _rng(plan, "likes")
+    for i in range(plan.likes):
+        # (post, round) pairs are unique, so no device likes a post twice.
+        post_id, round_ = i % plan.posts + 1, i // plan.posts
+        device_id = (round_ + post_id * 7) % plan.devices + 1
+        yield (i + 1, post_id, device_id, _timestamp(rng))
+
+
+def gen_comments(plan: Plan):
+    rng = _rng(plan, "comments")
+    # Latest comment per post; new comments often reply to it, so threads
+    # get a few levels deep.
+    latest: dict[int, tuple[int, str, int]] = {}
+    for i in range(1, plan.comments + 1):
+        created = _timestamp(rng)
+        post_id = rng.randint(1, plan.posts)
+        parent = latest.get(post_id)
+        if parent is None or parent[2] >= REPLY_MAX_DEPTH or rng.random() > REPLY_RATIO:
+            parent = (None, "", -1)
+        path = f"{parent[1]}{i:012d}"
+        latest[post_id] = (i, path, parent[2] + 1)
+        yield (
+            i,
+            rng.randint(1, plan.users),
+            post_id,
+            parent[0],
+            path,
+            parent[2] + 1,
+            _words(rng, rng.randint(3, 40)),
+            rng.random() > 0.02,
+            created,
+            created,
+        )
+
+
+GENERATORS = [
+    (
+        "users",
+        "id, email, first_name, post_count, post_read_count, is_active, is_staff, "
+        "is_superuser, is_deleted, created_at, updated_at",
+        gen_users,
+    ),
+    ("categories", "id, name, slug, created_at", gen_categories),
+    ("tags", "id, name, slug, created_at", gen_tags),
+    (
+        "posts",
+        "id, user_id, title, slug, body, category_id, views_count, likes_count, "
+        "comments_count, mins_read, is_active, created_at, updated_at",
+        gen_posts,
+    ),
+    ("post_tags", "post_id, tag_id", gen_post_tags),
+    ("devices", "id, device_key, user_agent, last_active", gen_devices),
+    ("likes", "id, post_id, device_id, created_at", gen_likes),
+    (
+        "comments",
+        "id, user_id, post_id, parent_id, path, depth, text, is_active, "
+        "created_at, updated_at",
+        gen_comments,
+    ),
+]
+
+FIXUPS = [
+    """
+    UPDATE posts SET likes_count = l.n FROM (
+        SELECT post_id, count(*) AS n FROM likes GROUP BY post_id
+    ) l WHERE posts.id = l.post_id
+    """,
+    """
+    UPDATE posts SET comments_count = c.n FROM (
+        SELECT post_id, count(*) AS n FROM comments WHERE is_active GROUP BY post_id
+    ) c WHERE posts.id = c.post_id
+    """,
+    """
+    UPDATE users SET post_count = p.n FROM (
+        SELECT user_id, count(*) AS n FROM posts WHERE is_active GROUP BY user_id
+    ) p WHERE users.id = p.user_id
+    """,
+    """
+    UPDATE categories SET post_count = p.n FROM (
+        SELECT category_id, count(*) AS n FROM posts WHERE is_active
+        GROUP BY category_id
+    ) p WHERE categories.id = p.category_id
+    """,
+    """
+    UPDATE tags SET post_count = p.n FROM (
+        SELECT pt.tag_id, count(*) AS n FROM post_tags pt
+        JOIN posts ON posts.id = pt.post_id WHERE posts.is_active
+        GROUP BY pt.tag_id
+    ) p WHERE tags.id = p.tag_id
+    """,
+]
+
+
+def _copy(cursor, table: str, columns: str, rows) -> int:
+    count = 0
+    while True:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        chunk = 0
+        for row in rows:
+            writer.writerow(row)
+            chunk += 1
+            if chunk == COPY_CHUNK_ROWS:
+                break
+        if not chunk:
+            return count
+
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+        count += chunk
+        if chunk < COPY_CHUNK_ROWS:
+            return count
+
+
+def seed(plan: Plan, truncate: bool = False) -> dict:
+    timings = {}
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            if truncate:
+                cursor.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM posts)")
+            if cursor.fetchone()[0]:
+                raise SystemExit("posts is not empty, rerun with --truncate")
+            # Skip row triggers (post counts, new post notifications) while
+            # loading; FIXUPS recompute the counters afterwards. Setting this
+            # needs a superuser, as does any benchmark database setup.
+            cursor.execute("SET LOCAL session_replication_role = replica")
+
+            for table, columns, generator in GENERATORS:
+                started = time.perf_counter()
+                rows = _copy(cursor, table, columns, generator(plan))
+                timings[table] = {
+                    "rows": rows,
+                    "seconds": round(time.perf_counter() - started, 2),
+                }
+
+            started = time.perf_counter()
+            for sql in FIXUPS:
+                cursor.execute(sql)
+            for table in TABLES:
+                if table != "post_tags":
+                    cursor.execute(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT coalesce(max(id), 1) FROM {table}))"
+                    )
+            timings["fixups"] = {"seconds": round(time.perf_counter() - started, 2)}
+        conn.commit()
+    finally:
+        conn.close()
+
+    started = time.perf_counter()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as c:
+        c.execute(text(f"ANALYZE {', '.join(TABLES)}"))
+    timings["analyze"] = {"seconds": round(time.perf_counter() - started, 2)}
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", choices=SCALES, default="10k")
+    size.add_argument("--rows", type=int, help="approximate total rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--body-words", type=int, default=200)
+    parser.add_argument("--truncate", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan only")
+    args = parser.parse_args()
+
+    plan = Plan.for_rows(
+        args.rows or SCALES[args.scale], seed=args.seed, body_words=args.body_words
+    )
+    result = {"plan": asdict(plan)}
+    if not args.dry_run:
+        result["tables"] = seed(plan, truncate=args.truncate)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measure worker startup: import time, SQL issued at import, and warm-up.
+
+python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+IMPORT_PROBE = """
+import json, time
+started = time.perf_counter()
+import database
+from sqlalchemy import event
+queries = []
+event.listen(database.engine, "before_cursor_execute", lambda *a: queries.append(a[2]))
+import main
+print(json.dumps({"import_seconds": time.perf_counter() - started, "queries": len(queries)}))
+"""
+
+
+def measure_import(runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    seconds = [s["import_seconds"] for s in samples]
+    return {
+        "runs": runs,
+        "median_seconds": round(statistics.median(seconds), 4),
+        "max_seconds": round(max(seconds), 4),
+        "queries_at_import": max(s["queries"] for s in samples),
+    }
+
+
+async def measure_lifespan() -> dict:
+    from main import app
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        warm_up_seconds = time.perf_counter() - started
+        steps = app.state.warm_up
+    return {"warm_up_seconds": round(warm_up_seconds, 4), "steps": steps}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-lifespan", action="store_true")
+    args = parser.parse_args()
+
+    result = {"import": measure_import(args.runs)}
+    if not args.skip_lifespan:
+        result["lifespan"] = asyncio.run(measure_lifespan())
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,8 +17,43 @@ DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 DB_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Connections each worker opens outside the pool (the live feed listener).
+DB_RESERVED_CONNECTIONS = 1
 
-engine = create_engine(DB_URL)
+
+def _pool_sizing() -> tuple[int, int]:
+    """Split DB_MAX_CONNECTIONS across workers, or use the explicit sizes."""
+    budget = os.getenv("DB_MAX_CONNECTIONS")
+    if not budget:
+        return (
+            int(os.getenv("DB_POOL_SIZE", "5")),
+            int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        )
+
+    per_worker = int(budget) // WEB_CONCURRENCY - DB_RESERVED_CONNECTIONS
+    if per_worker < 1:
+        raise RuntimeError(
+            f"DB_MAX_CONNECTIONS={budget} is too small for {WEB_CONCURRENCY} workers"
+        )
+    # Two thirds stay open; the rest is overflow that is closed when idle.
+    pool_size = max(1, per_worker * 2 // 3)
+    return pool_size, per_worker - pool_size
+
+
+DB_POOL_SIZE, DB_MAX_OVERFLOW = _pool_sizing()
+
+
+# The engine is lazy: no connection is opened until the first query, so
+# importing this module never touches Postgres.
+engine = create_engine(
+    DB_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+)
 
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
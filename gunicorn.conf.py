@@ -0,0 +1,33 @@
+"""Gunicorn settings for production; see serve.py.
+
+gunicorn -c gunicorn.conf.py main:app
+"""
+
+import os
+
+
+workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+# database.py splits DB_MAX_CONNECTIONS by this, so it must be set before
+# the app is preloaded below.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_class = "serve.Worker"
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+
+# Importing main opens no connections and starts no tasks (the engine is
+# lazy and background work starts in the lifespan), so workers can share
+# the preloaded modules copy-on-write.
+preload_app = True
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # Never reuse a connection inherited from the master, should one exist.
+    from database import engine
+
+    engine.dispose(close=False)
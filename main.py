@@ -1,26 +1,83 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 
 from routers import posts_router
 from routers import tags_router
 from routers import categories_router
 from routers import profession_router
-from database import engine
-import models
+from routers import debug_router
+from routers import bulk_router
+from routers import auth_router
+from routers import users_router
+from routers import admin_router
+from routers import feed_router
+from routers import home_router
+from routers import authors_router
+from routers import comments_router
+from services import query_stats
+from services.compression import CompressionMiddleware
+from services import startup
 from weather.weather import router as weather_app
 
 
-models.Base.metadata.create_all(bind=engine)
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.warm_up = await startup.warm_up()
+    tasks = startup.start_background_tasks()
+    yield
+    await startup.shutdown(tasks)
 
 
 app = FastAPI(
     title="Chesnokbek sarguzashtlari",
     description="Bu dastur Chesnokbekning sarguzashtlarini boshqarish uchun mo'ljallangan API.",
     version="1.0.0",
+    debug=DEBUG,
+    lifespan=lifespan,
 )
 
+# Registered before the http middleware below so it sits inside it and sees
+# whole response bodies rather than the re-streamed chunks.
+app.add_middleware(CompressionMiddleware)
+
+
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    stats, token = query_stats.begin()
+    try:
+        response = await call_next(request)
+    finally:
+        route = request.scope.get("route")
+        endpoint = f"{request.method} {route.path if route else '<unmatched>'}"
+        query_stats.end(token, endpoint, stats)
+
+    if DEBUG:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_ms:.2f}"
+        response.headers["X-DB-Slow-Query-Count"] = str(len(stats.slow))
+        if stats.slow:
+            slowest = max(stats.slow, key=lambda s: s[1])
+            response.headers["X-DB-Slowest-Query"] = slowest[0][:200]
+
+    return response
+
 
 app.include_router(weather_app, prefix="/info", tags=["weather"])
 app.include_router(posts_router)
 app.include_router(tags_router)
 app.include_router(categories_router)
 app.include_router(profession_router)
+app.include_router(debug_router)
+app.include_router(bulk_router)
+app.include_router(auth_router)
+app.include_router(users_router)
+app.include_router(admin_router)
+app.include_router(feed_router)
+app.include_router(home_router)
+app.include_router(authors_router)
+app.include_router(comments_router)
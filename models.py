@@ -2,6 +2,8 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
     Integer,
+    Float,
+    SmallInteger,
     BigInteger,
     String,
     Boolean,
@@ -11,13 +13,28 @@ from sqlalchemy import (
     func,
     Table,
     Column,
+    Index,
+    and_,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import (
+    Mapped,
+    Session,
+    mapped_column,
     relationship,
+    with_loader_criteria,
 )
-from sqlalchemy.orm import Mapped, mapped_column
 
 from database import Base
 
 
+# Rows public reads may see; partial indexes below use the same predicate.
+LIVE_ROW_SQL = "is_active AND deleted_at IS NULL"
+COMMENT_PATH_WIDTH = 12
+
+
 class BaseModel(Base):
     __abstract__ = True
 
@@ -42,7 +59,7 @@ class User(BaseModel):
     __tablename__ = "users"
 
     email: Mapped[str] = mapped_column(String(50), unique=True, nullable=True)
-    password: Mapped[str] = mapped_column(String(100), nullable=True)
+    password: Mapped[str] = mapped_column(String(255), nullable=True)
     first_name: Mapped[str] = mapped_column(String(50), nullable=True)
     profession_id: Mapped[int] = mapped_column(
         ForeignKey("professions.id"), nullable=True
@@ -63,10 +80,54 @@ class User(BaseModel):
         return f"User({self.first_name})"
 
 
+class AuthorStats(Base):
+    """Read-only mapping of the ``author_stats`` materialized view.
+
+    Refreshed by services.author_stats; ``is_view`` keeps it out of
+    autogenerated migrations.
+    """
+
+    __tablename__ = "author_stats"
+    __table_args__ = {"info": {"is_view": True}}
+
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    posts: Mapped[int] = mapped_column(BigInteger)
+    views: Mapped[int] = mapped_column(BigInteger)
+    likes: Mapped[int] = mapped_column(BigInteger)
+    comments: Mapped[int] = mapped_column(BigInteger)
+
+
+class UserSession(Base):
+    __tablename__ = "user_sessions"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False, index=True
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    def __repr__(self):
+        return f"UserSession(user_id={self.user_id})"
+
+
 class Category(BaseModel):
     __tablename__ = "categories"
+    __table_args__ = (
+        Index(
+            "ix_categories_slug_pattern",
+            "slug",
+            postgresql_ops={"slug": "varchar_pattern_ops"},
+        ),
+    )
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     slug: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    # Live posts; maintained by triggers, see services.counters.
+    post_count: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
 
     def __repr__(self):
         return f"Category({self.name})"
@@ -74,10 +135,47 @@ class Category(BaseModel):
 
 class Post(BaseModel):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index(
+            "ix_posts_slug_pattern",
+            "slug",
+            postgresql_ops={"slug": "varchar_pattern_ops"},
+        ),
+        # Lets conditional GETs validate a slug without touching the heap.
+        Index(
+            "ix_posts_slug_validators",
+            "slug",
+            postgresql_include=["id", "updated_at"],
+            postgresql_where=text(LIVE_ROW_SQL),
+        ),
+        Index(
+            "ix_posts_active_created_at",
+            "created_at",
+            postgresql_include=["id", "title", "slug"],
+            postgresql_where=text(LIVE_ROW_SQL),
+        ),
+        Index(
+            "ix_posts_category_id_created_at",
+            "category_id",
+            "created_at",
+            postgresql_include=["id", "title", "slug"],
+            postgresql_where=text(LIVE_ROW_SQL),
+        ),
+        Index("ix_posts_user_id_created_at", "user_id", "created_at"),
+        Index(
+            "ix_posts_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     slug: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
     body: Mapped[str] = mapped_column(Text)
+    # Derived from body by services.content on every write.
+    body_html: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    excerpt: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    word_count: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
     category_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("categories.id"), nullable=True
     )
@@ -86,7 +184,11 @@ class Post(BaseModel):
     comments_count: Mapped[int] = mapped_column(BigInteger, default=0)
     mins_read: Mapped[int] = mapped_column(BigInteger, default=0)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
+    user: Mapped["User"] = relationship(back_populates="posts", lazy="raise_on_sql")
     tags: Mapped[list["Tag"]] = relationship(
         secondary="post_tags", back_populates="posts", lazy="raise_on_sql"
     )
@@ -95,20 +197,77 @@ class Post(BaseModel):
         return f"<Post(title={self.title})>"
 
 
+class RelatedPost(Base):
+    __tablename__ = "related_posts"
+
+    post_id: Mapped[int] = mapped_column(ForeignKey("posts.id"), primary_key=True)
+    rank: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    related_post_id: Mapped[int] = mapped_column(
+        ForeignKey("posts.id"), nullable=False, index=True
+    )
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"RelatedPost({self.post_id} -> {self.related_post_id})"
+
+
 class Comment(BaseModel):
     __tablename__ = "comments"
+    __table_args__ = (
+        # Thread pages are one range scan over (post_id, path).
+        Index(
+            "ix_comments_live_post_id_path",
+            "post_id",
+            "path",
+            postgresql_include=["depth"],
+            postgresql_where=text(LIVE_ROW_SQL),
+        ),
+        Index("ix_comments_user_id", "user_id"),
+        Index(
+            "ix_comments_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=True)
+    # Anonymous comments are attributed to the commenter's device.
+    device_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("devices.id"), nullable=True
+    )
     post_id: Mapped[int] = mapped_column(ForeignKey("posts.id"), nullable=False)
+    parent_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("comments.id", ondelete="SET NULL"), nullable=True
+    )
+    # Ancestor ids then own id, each as COMMENT_PATH_WIDTH zero-padded digits,
+    # so sorting by path (byte order) lists a thread depth-first.
+    path: Mapped[str] = mapped_column(String(collation="C"), nullable=False)
+    depth: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
     text: Mapped[str] = mapped_column(Text, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
 
 class Tag(BaseModel):
     __tablename__ = "tags"
+    __table_args__ = (
+        Index(
+            "ix_tags_slug_pattern",
+            "slug",
+            postgresql_ops={"slug": "varchar_pattern_ops"},
+        ),
+    )
 
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     slug: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    # Live posts; maintained by triggers, see services.counters.
+    post_count: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+
+    posts: Mapped[list["Post"]] = relationship(
+        secondary="post_tags", back_populates="tags", lazy="raise_on_sql"
+    )
 
 
 class Media(BaseModel):
@@ -137,8 +296,11 @@ class UserSearch(Base):
 
 class Device(Base):
     __tablename__ = "devices"
+    __table_args__ = (Index("ix_devices_device_key", "device_key", unique=True),)
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # sha256 hex of client token + user agent, see services.devices.
+    device_key: Mapped[str] = mapped_column(String(64), nullable=False)
     user_agent: Mapped[str] = mapped_column(String(255), nullable=False)
     last_active: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False
@@ -148,8 +310,34 @@ class Device(Base):
         return f"Device({self.user_agent})"
 
 
+class ReadingHistory(Base):
+    __tablename__ = "reading_histories"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    device_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("devices.id"), unique=True, nullable=True
+    )
+    user_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("users.id"), unique=True, nullable=True
+    )
+    post_ids: Mapped[list[int]] = mapped_column(
+        ARRAY(BigInteger), nullable=False, server_default="{}"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"ReadingHistory(device_id={self.device_id}, user_id={self.user_id})"
+
+
 class Like(Base):
     __tablename__ = "likes"
+    __table_args__ = (
+        Index("ix_likes_post_id_created_at", "post_id", "created_at"),
+        Index("ix_likes_post_id_device_id", "post_id", "device_id", unique=True),
+        Index("ix_likes_device_id", "device_id"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     post_id: Mapped[int] = mapped_column(
@@ -171,4 +359,45 @@ post_tag_m2m_table = Table(
     Base.metadata,
     Column("post_id", BigInteger, ForeignKey("posts.id"), primary_key=True),
     Column("tag_id", BigInteger, ForeignKey("tags.id"), primary_key=True),
+    Index("ix_post_tags_tag_id_post_id", "tag_id", "post_id"),
 )
+
+
+def live_rows(include_inactive: bool = False) -> list:
+    """Loader criteria hiding soft-deleted (and, by default, inactive) rows."""
+    if include_inactive:
+        return [
+            with_loader_criteria(Post, lambda cls: cls.deleted_at.is_(None)),
+            with_loader_criteria(Comment, lambda cls: cls.deleted_at.is_(None)),
+            with_loader_criteria(User, lambda cls: cls.is_deleted.is_not(True)),
+        ]
+    return [
+        with_loader_criteria(
+            Post, lambda cls: and_(cls.is_active, cls.deleted_at.is_(None))
+        ),
+        with_loader_criteria(
+            Comment,
+            lambda cls: and_(cls.is_active, cls.deleted_at.is_(None)),
+        ),
+        with_loader_criteria(User, lambda cls: cls.is_deleted.is_not(True)),
+    ]
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_removed_rows(state):
+    """Apply live_rows() to every ORM select.
+
+    Opt out per statement with ``execution_options(include_inactive=True)``
+    (drafts, still hiding deleted rows) or ``include_deleted=True`` (everything,
+    for admin tools and maintenance).
+    """
+    if (
+        not state.is_select
+        or state.is_column_load
+        or state.is_relationship_load
+        or state.execution_options.get("include_deleted", False)
+    ):
+        return
+
+    include_inactive = state.execution_options.get("include_inactive", False)
+    state.statement = state.statement.options(*live_rows(include_inactive))
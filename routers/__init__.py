@@ -2,6 +2,29 @@ from .posts import router as posts_router
 from .tags import router as tags_router
 from .category import router as categories_router
 from .profession import router as profession_router
+from .debug import router as debug_router
+from .bulk import router as bulk_router
+from .auth import router as auth_router
+from .users import router as users_router
+from .admin import router as admin_router
+from .feed import router as feed_router
+from .home import router as home_router
+from .authors import router as authors_router
+from .comments import router as comments_router
 
 
-__all__ = ["posts_router", "tags_router", "categories_router", "profession_router"]
+__all__ = [
+    "posts_router",
+    "tags_router",
+    "categories_router",
+    "profession_router",
+    "debug_router",
+    "bulk_router",
+    "auth_router",
+    "users_router",
+    "admin_router",
+    "feed_router",
+    "home_router",
+    "authors_router",
+    "comments_router",
+]
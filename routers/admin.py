@@ -0,0 +1,195 @@
+import os
+from collections import Counter
+from typing import Literal
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select, text, update
+
+from database import db_dep
+from models import Comment, Post, Tag, User, post_tag_m2m_table
+from schemas import ModerationFilter, ModerationRequest, ModerationResponse
+from services import feeds, http_cache, post_cache, response_cache, scheduler
+from services.compactor import delete_with_children
+from services.auth import get_admin_user, revoke_user_sessions
+
+
+router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(get_admin_user)]
+)
+
+ADMIN_CHUNK_SIZE = int(os.getenv("ADMIN_CHUNK_SIZE", "1000"))
+MAX_RETURNED_IDS = 1000
+
+Entity = Literal["posts", "comments", "tags", "users"]
+Action = Literal["activate", "deactivate", "delete"]
+
+MODELS = {"posts": Post, "comments": Comment, "tags": Tag, "users": User}
+
+# Plain SQL, so the counters move without touching the posts' updated_at.
+_COMMENTS_COUNT_SQL = text("""
+UPDATE posts SET comments_count = posts.comments_count + v.n
+FROM unnest(CAST(:post_ids AS BIGINT[]), CAST(:counts AS BIGINT[])) AS v(id, n)
+WHERE posts.id = v.id
+""")
+
+
+def _filter_conditions(entity: str, model, filter: ModerationFilter):
+    conditions = []
+    for name, value in filter.model_dump(exclude_none=True).items():
+        if name == "created_after":
+            conditions.append(model.created_at >= value)
+        elif name == "created_before":
+            conditions.append(model.created_at < value)
+        elif name in model.__table__.c:
+            conditions.append(model.__table__.c[name] == value)
+        else:
+            raise HTTPException(
+                status_code=400, detail=f"{entity} cannot be filtered by {name}"
+            )
+
+    if not conditions:
+        raise HTTPException(status_code=400, detail="Filter is empty")
+    return conditions
+
+
+def _set_flag(model, column, value):
+    def build(selected):
+        return (
+            update(model)
+            .where(model.id.in_(selected))
+            .values({column: value})
+            .returning(model.id)
+        )
+
+    return build
+
+
+def _statement_builder(entity: str, action: str):
+    model = MODELS[entity]
+
+    if action == "delete":
+        if entity == "users":
+            return _set_flag(model, "is_deleted", True), User.is_deleted.is_(False)
+        if entity == "tags":
+            return delete_with_children(Tag, [post_tag_m2m_table.c.tag_id]), None
+        # Posts and comments are soft-deleted; the compactor purges them later.
+        return _set_flag(model, "deleted_at", func.now()), model.deleted_at.is_(None)
+
+    if "is_active" not in model.__table__.c:
+        raise HTTPException(status_code=400, detail=f"{entity} cannot be {action}d")
+
+    value = action == "activate"
+    return _set_flag(model, "is_active", value), model.is_active.is_distinct_from(value)
+
+
+def _apply_to_comments(session, stmt, action: str) -> list[int]:
+    """Run a comments statement and move ``posts.comments_count`` with it."""
+    # The flag the action leaves alone tells whether a row entered or left
+    # the live set: the pending filter already excludes no-op rows.
+    if action == "delete":
+        counted = Comment.is_active
+    else:
+        counted = Comment.deleted_at.is_(None)
+    rows = session.execute(stmt.returning(Comment.post_id, counted)).all()
+
+    sign = 1 if action == "activate" else -1
+    changed = Counter(post_id for _, post_id, live in rows if live)
+    if changed:
+        session.execute(
+            _COMMENTS_COUNT_SQL,
+            {
+                "post_ids": list(changed),
+                "counts": [sign * n for n in changed.values()],
+            },
+        )
+    return [row[0] for row in rows]
+
+
+def _moderate(session, entity: str, action: str, data: ModerationRequest):
+    model = MODELS[entity]
+    build, pending = _statement_builder(entity, action)
+    result = ModerationResponse(entity=entity, action=action, affected=0, ids=[])
+
+    def apply(selected):
+        stmt = build(selected).execution_options(synchronize_session=False)
+        if entity == "comments":
+            ids = _apply_to_comments(session, stmt, action)
+        else:
+            ids = session.execute(stmt).scalars().all()
+        session.commit()
+        # After the commit, so a login cannot add a session the revoke misses.
+        if entity == "users" and action != "activate" and ids:
+            revoke_user_sessions(session, ids)
+
+        result.affected += len(ids)
+        result.ids.extend(ids[: MAX_RETURNED_IDS - len(result.ids)])
+        return ids
+
+    if data.ids is not None:
+        ids = sorted(set(data.ids))
+        for i in range(0, len(ids), ADMIN_CHUNK_SIZE):
+            selected = select(model.id).where(
+                model.id.in_(ids[i : i + ADMIN_CHUNK_SIZE])
+            )
+            if pending is not None:
+                selected = selected.where(pending)
+            apply(selected)
+        return result
+
+    conditions = _filter_conditions(entity, model, data.filter)
+    if pending is not None:
+        conditions.append(pending)
+
+    last_id = 0
+    while True:
+        chunk = (
+            select(model.id)
+            .where(*conditions, model.id > last_id)
+            .order_by(model.id)
+            .limit(ADMIN_CHUNK_SIZE)
+            .cte("selected")
+        )
+        ids = apply(select(chunk.c.id))
+        if len(ids) < ADMIN_CHUNK_SIZE:
+            return result
+        last_id = max(ids)
+
+
+@router.post("/{entity}/{action}/", response_model=ModerationResponse)
+async def moderate(
+    session: db_dep,
+    entity: Entity,
+    action: Action,
+    data: ModerationRequest,
+    background_tasks: BackgroundTasks,
+):
+    if (data.ids is None) == (data.filter is None):
+        raise HTTPException(
+            status_code=400, detail="Provide either ids or filter, not both"
+        )
+
+    result = await run_in_threadpool(_moderate, session, entity, action, data)
+
+    if entity == "posts" and result.affected:
+        if result.affected > len(result.ids):
+            keys = [http_cache.ALL_POSTS_KEY]
+            post_cache.clear()
+        else:
+            keys = [http_cache.post_key(post_id) for post_id in result.ids]
+            post_cache.invalidate(result.ids)
+        # Activated posts have to be placed, so every feed is rebuilt.
+        if action == "activate" or result.affected > len(result.ids):
+            feeds.clear()
+        else:
+            feeds.remove(result.ids)
+        background_tasks.add_task(http_cache.purge, keys)
+    if entity == "tags" and result.affected:
+        response_cache.invalidate("tags", ("tags", "popular"))
+    return result
+
+
+@router.get("/jobs/")
+async def get_jobs():
+    """Scheduled jobs as seen by the worker that serves this request."""
+    return scheduler.report()
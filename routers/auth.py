@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Response
+from sqlalchemy import select
+
+from database import db_dep
+from models import User
+from schemas import LoginRequest, TokenResponse
+from services.auth import (
+    DEBUG,
+    SESSION_COOKIE_NAME,
+    SESSION_TTL_SECONDS,
+    auth_dep,
+    create_session,
+    revoke_session,
+    verify_password,
+)
+
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+
+@router.post("/login/", response_model=TokenResponse)
+async def login(session: db_dep, data: LoginRequest, response: Response):
+    stmt = select(User).where(
+        User.email == data.email,
+        User.is_active.is_(True),
+        User.is_deleted.is_(False),
+    )
+    user = session.execute(stmt).scalars().first()
+
+    password_hash = user.password if user else None
+    if not await verify_password(password_hash, data.password):
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+
+    token, expires_at = create_session(session, user)
+    response.set_cookie(
+        key=SESSION_COOKIE_NAME,
+        value=token,
+        max_age=SESSION_TTL_SECONDS,
+        httponly=True,
+        secure=not DEBUG,
+        samesite="lax",
+    )
+
+    return TokenResponse(access_token=token, expires_at=expires_at)
+
+
+@router.post("/logout/", status_code=204)
+async def logout(session: db_dep, user: auth_dep, response: Response):
+    revoke_session(session, user.session_id)
+    response.delete_cookie(
+        SESSION_COOKIE_NAME, httponly=True, secure=not DEBUG, samesite="lax"
+    )
@@ -0,0 +1,36 @@
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from database import db_dep
+from schemas import AuthorProfileResponse, AuthorStatsResponse
+from services import author_stats, response_cache
+
+
+router = APIRouter(prefix="/authors", tags=["Authors"])
+
+Metric = Literal["views", "likes", "posts", "comments"]
+
+
+@router.get("/top/", response_model=list[AuthorStatsResponse])
+async def get_top_authors(
+    session: db_dep,
+    request: Request,
+    sort: Metric = "views",
+    limit: int = Query(20, ge=1, le=100),
+):
+    entry = await response_cache.get_or_build(
+        session,
+        ("authors_top", sort, limit),
+        list[AuthorStatsResponse],
+        lambda session: author_stats.top(session, sort, limit),
+    )
+    return entry.response(request.headers.get("accept-encoding"))
+
+
+@router.get("/{user_id}/", response_model=AuthorProfileResponse)
+async def get_author(session: db_dep, user_id: int):
+    author = author_stats.profile(session, user_id)
+    if author is None:
+        raise HTTPException(status_code=404, detail="User Not found")
+    return author
@@ -0,0 +1,390 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Literal
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import String, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import SessionLocal, db_dep
+from models import Category, Post, Tag, User, post_tag_m2m_table
+from schemas import (
+    BulkImportError,
+    BulkImportReport,
+    CategoryImportRow,
+    PostImportRow,
+    TagImportRow,
+)
+from services import content, feeds, http_cache, post_cache, related, response_cache
+from services.slugs import unique_slugs
+from services.auth import get_admin_user
+
+
+router = APIRouter(
+    prefix="/bulk", tags=["Bulk"], dependencies=[Depends(get_admin_user)]
+)
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 1000
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+Entity = Literal["posts", "tags", "categories"]
+Format = Literal["ndjson", "csv"]
+
+ROW_SCHEMAS = {
+    "posts": PostImportRow,
+    "tags": TagImportRow,
+    "categories": CategoryImportRow,
+}
+MODELS = {"posts": Post, "tags": Tag, "categories": Category}
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class _Report:
+    def __init__(self, entity: str):
+        self.entity = entity
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[BulkImportError] = []
+        self.started = time.perf_counter()
+
+    def fail(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(BulkImportError(line=line, error=error))
+
+    def finish(self) -> BulkImportReport:
+        elapsed = time.perf_counter() - self.started
+        return BulkImportReport(
+            entity=self.entity,
+            rows=self.rows,
+            imported=self.imported,
+            failed=self.failed,
+            errors=self.errors,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(self.rows / elapsed, 1) if elapsed else 0.0,
+        )
+
+
+def _read_records(file, fmt: str):
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            record = {k: v for k, v in record.items() if v not in ("", None)}
+            if "tags" in record:
+                record["tags"] = [t for t in record["tags"].split("|") if t]
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if line.strip():
+            yield line_no, line
+
+
+def _parse(schema, record):
+    if isinstance(record, str):
+        return schema.model_validate_json(record)
+    return schema.model_validate(record)
+
+
+def _dedupe_by_slug(batch, report: _Report):
+    by_slug = {}
+    for line, row in batch:
+        if row.slug in by_slug:
+            report.fail(
+                by_slug[row.slug][0],
+                f"duplicate slug '{row.slug}', superseded by line {line}",
+            )
+        by_slug[row.slug] = (line, row)
+    return list(by_slug.values())
+
+
+def _lookup(session, column, key_column, keys):
+    if not keys:
+        return {}
+    stmt = select(key_column, column).where(key_column.in_(keys))
+    return dict(session.execute(stmt).all())
+
+
+def _write_posts(session, batch, report: _Report, written: list[int]):
+    categories = _lookup(
+        session,
+        Category.id,
+        Category.slug,
+        {row.category for _, row in batch if row.category},
+    )
+    tags = _lookup(
+        session, Tag.id, Tag.slug, {slug for _, row in batch for slug in row.tags}
+    )
+    user_ids = {row.user_id for _, row in batch}
+    users = set(session.scalars(select(User.id).where(User.id.in_(user_ids))))
+
+    now = datetime.now(timezone.utc)
+    values = []
+    tag_ids_by_slug = {}
+    for line, row in batch:
+        if row.user_id not in users:
+            report.fail(line, f"unknown user_id {row.user_id}")
+            continue
+        if row.category and row.category not in categories:
+            report.fail(line, f"unknown category '{row.category}'")
+            continue
+        missing = [slug for slug in row.tags if slug not in tags]
+        if missing:
+            report.fail(line, f"unknown tags: {', '.join(missing)}")
+            continue
+
+        values.append(
+            {
+                "user_id": row.user_id,
+                "title": row.title,
+                "slug": row.slug,
+                "body": row.body,
+                "category_id": categories.get(row.category),
+                "is_active": row.is_active,
+                "created_at": row.created_at or now,
+            }
+        )
+        tag_ids_by_slug[row.slug] = {tags[slug] for slug in row.tags}
+        written.append(line)
+
+    if not values:
+        return
+
+    rendered = content.render_many([value["body"] for value in values])
+    for value, fields in zip(values, rendered):
+        value.update(fields)
+
+    stmt = insert(Post)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Post.slug],
+        set_={
+            "title": stmt.excluded.title,
+            "body": stmt.excluded.body,
+            "body_html": stmt.excluded.body_html,
+            "excerpt": stmt.excluded.excerpt,
+            "word_count": stmt.excluded.word_count,
+            "mins_read": stmt.excluded.mins_read,
+            "category_id": stmt.excluded.category_id,
+            "is_active": stmt.excluded.is_active,
+            "deleted_at": None,
+            "updated_at": func.now(),
+        },
+    ).returning(Post.id, Post.slug)
+    post_ids = {slug: id for id, slug in session.execute(stmt, values).all()}
+
+    session.execute(
+        delete(post_tag_m2m_table).where(
+            post_tag_m2m_table.c.post_id.in_(post_ids.values())
+        )
+    )
+    pairs = [
+        {"post_id": post_ids[slug], "tag_id": tag_id}
+        for slug, tag_ids in tag_ids_by_slug.items()
+        for tag_id in tag_ids
+    ]
+    if pairs:
+        session.execute(insert(post_tag_m2m_table).on_conflict_do_nothing(), pairs)
+
+
+def _named_writer(model):
+    def write(session, batch, report: _Report, written: list[int]):
+        existing = _lookup(
+            session, model.slug, model.name, {row.name for _, row in batch}
+        )
+
+        values = []
+        for line, row in batch:
+            if existing.get(row.name, row.slug) != row.slug:
+                report.fail(
+                    line,
+                    f"name '{row.name}' already used by slug '{existing[row.name]}'",
+                )
+                continue
+            values.append({"name": row.name, "slug": row.slug})
+            written.append(line)
+
+        if not values:
+            return
+
+        stmt = insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[model.slug],
+            set_={"name": stmt.excluded.name, "updated_at": func.now()},
+        )
+        session.execute(stmt, values)
+
+    return write
+
+
+WRITERS = {
+    "posts": _write_posts,
+    "tags": _named_writer(Tag),
+    "categories": _named_writer(Category),
+}
+
+
+def _fill_missing_slugs(session, entity: str, batch):
+    rows = [row for _, row in batch if not row.slug]
+    if not rows:
+        return
+
+    texts = [row.title if entity == "posts" else row.name for row in rows]
+    for row, slug in zip(rows, unique_slugs(session, MODELS[entity], texts)):
+        row.slug = slug
+
+
+def _flush_batch(session, entity: str, batch, report: _Report):
+    written = []
+    try:
+        _fill_missing_slugs(session, entity, batch)
+        batch = _dedupe_by_slug(batch, report)
+        WRITERS[entity](session, batch, report, written)
+        session.commit()
+        report.imported += len(written)
+    except SQLAlchemyError as exc:
+        session.rollback()
+        error = str(getattr(exc, "orig", exc)).strip()
+        for line in written or [line for line, _ in batch]:
+            report.fail(line, error)
+
+
+def _import(session, entity: str, file, fmt: str) -> BulkImportReport:
+    schema = ROW_SCHEMAS[entity]
+    report = _Report(entity)
+    batch = []
+
+    for line, record in _read_records(file, fmt):
+        report.rows += 1
+        try:
+            row = _parse(schema, record)
+        except ValidationError as exc:
+            report.fail(line, "; ".join(e["msg"] for e in exc.errors()))
+            continue
+
+        batch.append((line, row))
+
+        if len(batch) >= BULK_BATCH_SIZE:
+            _flush_batch(session, entity, batch, report)
+            batch = []
+
+    if batch:
+        _flush_batch(session, entity, batch, report)
+
+    return report.finish()
+
+
+async def _spool_body(request: Request):
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    async for chunk in request.stream():
+        file.write(chunk)
+    file.seek(0)
+    return file
+
+
+@router.post("/{entity}/import/", response_model=BulkImportReport)
+async def bulk_import(
+    entity: Entity,
+    request: Request,
+    session: db_dep,
+    background_tasks: BackgroundTasks,
+    format: Format | None = None,
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+
+    file = await _spool_body(request)
+    try:
+        report = await run_in_threadpool(_import, session, entity, file, format)
+    finally:
+        file.close()
+
+    if report.imported:
+        if entity == "posts":
+            post_cache.clear()
+            feeds.clear()
+            background_tasks.add_task(related.rebuild_all)
+            background_tasks.add_task(http_cache.purge, [http_cache.ALL_POSTS_KEY])
+        else:
+            response_cache.invalidate(entity, (entity, "popular"))
+    return report
+
+
+def _export_statement(entity: str):
+    if entity == "posts":
+        # Both default to empty so every exported row imports back.
+        tags = (
+            select(func.coalesce(func.array_agg(Tag.slug), literal([], ARRAY(String))))
+            .join(post_tag_m2m_table, post_tag_m2m_table.c.tag_id == Tag.id)
+            .where(post_tag_m2m_table.c.post_id == Post.id)
+            .scalar_subquery()
+        )
+        return (
+            select(
+                Post.slug,
+                Post.title,
+                func.coalesce(Post.body, "").label("body"),
+                Post.user_id,
+                Category.slug.label("category"),
+                tags.label("tags"),
+                Post.is_active,
+                Post.created_at,
+            )
+            .outerjoin(Category, Post.category_id == Category.id)
+            .order_by(Post.id)
+        )
+
+    model = Tag if entity == "tags" else Category
+    return select(model.slug, model.name).order_by(model.id)
+
+
+def _export_rows(entity: str, fmt: str):
+    with SessionLocal() as session:
+        stmt = _export_statement(entity).execution_options(
+            yield_per=BULK_BATCH_SIZE, include_inactive=True
+        )
+        result = session.execute(stmt)
+
+        if fmt == "ndjson":
+            for partition in result.partitions():
+                yield "".join(
+                    json.dumps(row._asdict(), default=str, ensure_ascii=False) + "\n"
+                    for row in partition
+                )
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(result.keys())
+        for partition in result.partitions():
+            for row in partition:
+                writer.writerow(
+                    "|".join(value) if isinstance(value, list) else value
+                    for value in row
+                )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+
+@router.get("/{entity}/export/")
+async def bulk_export(entity: Entity, format: Format = "ndjson"):
+    return StreamingResponse(
+        _export_rows(entity, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'},
+    )
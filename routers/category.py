@@ -1,31 +1,51 @@
-from fastapi import APIRouter, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Request
 from sqlalchemy import select
 
 from database import db_dep
 from models import Category
 from schemas import CategoryCreateRequest, CategoryListResonse
-from utils import generate_slug
+from services import response_cache
+from services.slugs import unique_slug
 
 router = APIRouter(prefix="/category", tags=["Category"])
 
 
-@router.get("/list/", response_model=list[CategoryListResonse])
-async def get_categories(session: db_dep):
+CACHE_KEY = "categories"
+POPULAR_CACHE_KEY = (CACHE_KEY, "popular")
+
+
+def _load_categories(session, sort: str = "name"):
     stmt = select(Category)
-    res = session.execute(stmt)
-    category = res.scalars().all()
+    if sort == "popular":
+        stmt = stmt.order_by(Category.post_count.desc(), Category.name)
+    else:
+        stmt = stmt.order_by(Category.name)
+    return session.execute(stmt).scalars().all()
 
-    if not category:
-        HTTPException(status_code=404, detail="List of tag is empty")
-    return category
+
+@router.get("/list/", response_model=list[CategoryListResonse])
+async def get_categories(
+    session: db_dep, request: Request, sort: Literal["name", "popular"] = "name"
+):
+    key = POPULAR_CACHE_KEY if sort == "popular" else CACHE_KEY
+    entry = await response_cache.get_or_build(
+        session,
+        key,
+        list[CategoryListResonse],
+        lambda session: _load_categories(session, sort),
+    )
+    return entry.response(request.headers.get("accept-encoding"))
 
 
 @router.post("/create/", response_model=CategoryListResonse)
 async def tag_create(session: db_dep, data: CategoryCreateRequest):
-    categorya = Category(name=data.name, slug=generate_slug(data.name))
+    categorya = Category(name=data.name, slug=unique_slug(session, Category, data.name))
     session.add(categorya)
     session.commit()
     session.refresh(categorya)
+    response_cache.invalidate(CACHE_KEY, POPULAR_CACHE_KEY)
 
     return categorya
 
@@ -40,10 +60,14 @@ async def update_category(
     if categorya is None:
         HTTPException(status_code=404, detail="Not Found")
 
-    categorya.name = update_d.name
-    categorya.slug = generate_slug(update_d.name)
+    if update_d.name != categorya.name:
+        categorya.name = update_d.name
+        categorya.slug = unique_slug(
+            session, Category, update_d.name, exclude_id=categorya.id
+        )
     session.commit()
     session.refresh(categorya)
+    response_cache.invalidate(CACHE_KEY, POPULAR_CACHE_KEY)
 
     return categorya
 
@@ -60,3 +84,4 @@ async def delete_category(session: db_dep, id: int):
 
     session.refresh(category)
     session.commit()
+    response_cache.invalidate(CACHE_KEY, POPULAR_CACHE_KEY)
@@ -0,0 +1,155 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import aliased
+
+from database import db_dep
+from models import COMMENT_PATH_WIDTH, Comment, Post
+from schemas import CommentCreateRequest, CommentPageResponse, CommentResponse
+from services.auth import optional_auth_dep
+from services.devices import device_dep
+
+
+router = APIRouter(prefix="/comments", tags=["Comments"])
+
+COMMENT_PAGE_SIZE = int(os.getenv("COMMENT_PAGE_SIZE", "50"))
+COMMENT_MAX_PAGE_SIZE = 200
+COMMENT_DEFAULT_DEPTH = int(os.getenv("COMMENT_DEFAULT_DEPTH", "3"))
+COMMENT_MAX_DEPTH = int(os.getenv("COMMENT_MAX_DEPTH", "32"))
+
+# Sorts after every digit, so [path, path + PATH_END) holds the descendants.
+PATH_END = ":"
+
+
+def _segment(comment_id: int) -> str:
+    return f"{comment_id:0{COMMENT_PATH_WIDTH}d}"
+
+
+def page_statement(
+    post_id: int, parent_id: int | None, after: str | None, depth: int, limit: int
+):
+    """One page of a thread, plus one row to tell whether another follows."""
+    stmt = select(Comment).where(Comment.post_id == post_id)
+    max_depth = depth
+
+    if parent_id is not None:
+        parent = aliased(Comment)
+        found = select(parent).where(parent.id == parent_id, parent.post_id == post_id)
+        parent_path = found.with_only_columns(parent.path).scalar_subquery()
+        parent_depth = found.with_only_columns(parent.depth).scalar_subquery()
+        stmt = stmt.where(
+            Comment.path > parent_path, Comment.path < parent_path + PATH_END
+        )
+        max_depth = parent_depth + 1 + depth
+
+    if after is not None:
+        if not after.isdigit() or len(after) % COMMENT_PATH_WIDTH:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(Comment.path > after)
+
+    stmt = stmt.where(Comment.depth <= max_depth).order_by(Comment.path)
+    return stmt.limit(limit + 1)
+
+
+@router.get("/", response_model=CommentPageResponse)
+async def get_comments(
+    session: db_dep,
+    post_id: int,
+    parent_id: int | None = None,
+    after: str | None = None,
+    depth: int = Query(COMMENT_DEFAULT_DEPTH, ge=0, le=COMMENT_MAX_DEPTH),
+    limit: int = Query(COMMENT_PAGE_SIZE, ge=1, le=COMMENT_MAX_PAGE_SIZE),
+):
+    """A page of a thread in reading order, replies under their parents.
+
+    ``depth`` is how many levels of replies to include: below the roots, or
+    below ``parent_id`` when loading the rest of a subtree. The whole page
+    is a single range scan of (post_id, path).
+    """
+    stmt = page_statement(post_id, parent_id, after, depth, limit)
+    comments = session.execute(stmt).scalars().all()
+
+    next_cursor = comments[limit - 1].path if len(comments) > limit else None
+    return {"comments": comments[:limit], "next_cursor": next_cursor}
+
+
+def _comments_count(session, post_id: int, delta: int):
+    session.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        # Keeps updated_at, so comments do not change the post's validators.
+        .values(comments_count=Post.comments_count + delta, updated_at=Post.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@router.post("/", response_model=CommentResponse, status_code=201)
+async def create_comment(
+    session: db_dep,
+    data: CommentCreateRequest,
+    current_user: optional_auth_dep,
+    device_id: device_dep,
+):
+    if session.scalar(select(Post.id).where(Post.id == data.post_id)) is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    path, depth = "", 0
+    if data.parent_id is not None:
+        parent = session.execute(
+            select(Comment.path, Comment.depth).where(
+                Comment.id == data.parent_id, Comment.post_id == data.post_id
+            )
+        ).first()
+        if parent is None:
+            raise HTTPException(status_code=404, detail="Parent comment not found")
+        if parent.depth >= COMMENT_MAX_DEPTH:
+            raise HTTPException(status_code=400, detail="Thread is too deep")
+        path, depth = parent.path, parent.depth + 1
+
+    # The id is taken first because it is the last segment of the path.
+    comment_id = session.scalar(
+        select(func.nextval(func.pg_get_serial_sequence("comments", "id")))
+    )
+    comment = Comment(
+        id=comment_id,
+        post_id=data.post_id,
+        parent_id=data.parent_id,
+        user_id=current_user.id if current_user else None,
+        device_id=None if current_user else device_id,
+        text=data.text,
+        path=path + _segment(comment_id),
+        depth=depth,
+        is_active=True,
+    )
+    session.add(comment)
+    _comments_count(session, data.post_id, 1)
+    session.commit()
+    session.refresh(comment)
+    return comment
+
+
+@router.delete("/{comment_id}/", status_code=204)
+async def delete_comment(
+    session: db_dep,
+    comment_id: int,
+    current_user: optional_auth_dep,
+    device_id: device_dep,
+):
+    comment = session.get(Comment, comment_id)
+    if comment is None:
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+    if current_user is not None:
+        allowed = comment.user_id == current_user.id or (
+            current_user.is_staff or current_user.is_superuser
+        )
+    else:
+        allowed = comment.user_id is None and comment.device_id == device_id
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Not your comment")
+
+    # Replies stay visible; the compactor purges the row later.
+    comment.deleted_at = func.now()
+    _comments_count(session, comment.post_id, -1)
+    session.commit()
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+
+from services import query_stats
+from services.auth import get_admin_user
+
+
+router = APIRouter(
+    prefix="/debug", tags=["Debug"], dependencies=[Depends(get_admin_user)]
+)
+
+
+@router.get("/queries/")
+async def get_query_report(limit: int = 50):
+    return query_stats.report(limit=limit)
+
+
+@router.delete("/queries/", status_code=204)
+async def reset_query_report():
+    query_stats.reset()
@@ -0,0 +1,62 @@
+import asyncio
+import os
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from services import live_feed
+
+
+router = APIRouter(prefix="/feed", tags=["Feed"])
+
+LIVE_FEED_HEARTBEAT = float(os.getenv("LIVE_FEED_HEARTBEAT", "15"))
+
+Format = Literal["sse", "ndjson"]
+MEDIA_TYPES = {"sse": "text/event-stream", "ndjson": "application/x-ndjson"}
+
+
+def _encode(post: dict, format: str) -> str:
+    if format == "sse":
+        return f"id: {post['id']}\nevent: post\ndata: {post['json']}\n\n"
+    return post["json"] + "\n"
+
+
+async def _stream(subscriber: live_feed.Subscriber, format: str):
+    heartbeat = ": ping\n\n" if format == "sse" else "\n"
+    try:
+        # Sent immediately so proxies and clients see the stream open.
+        yield heartbeat
+        while True:
+            try:
+                post = await asyncio.wait_for(
+                    subscriber.queue.get(), LIVE_FEED_HEARTBEAT
+                )
+            except TimeoutError:
+                yield heartbeat
+                continue
+
+            if post is None:
+                if format == "sse":
+                    yield "event: closed\ndata: {}\n\n"
+                return
+            yield _encode(post, format)
+    finally:
+        live_feed.unsubscribe(subscriber)
+
+
+@router.get("/posts/")
+async def post_feed(
+    category_id: int | None = None,
+    tag_id: int | None = None,
+    format: Format = "sse",
+):
+    subscriber = live_feed.subscribe(category_id=category_id, tag_id=tag_id)
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Live feed is full")
+
+    return StreamingResponse(
+        _stream(subscriber, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
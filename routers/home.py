@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import os
+
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import Post
+from routers.category import _load_categories
+from routers.tags import _load_tags
+from schemas import HomeResponse
+from services import response_cache, trending
+from weather.weather import TASHKENT_LAT, TASHKENT_LON, fetch_weather
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/home", tags=["Home"])
+
+HOME_CACHE_TTL = float(os.getenv("HOME_CACHE_TTL", "30"))
+# Degraded pages are cached briefly so a recovered section shows up soon.
+HOME_DEGRADED_TTL = float(os.getenv("HOME_DEGRADED_TTL", "5"))
+HOME_SECTION_TIMEOUT = float(os.getenv("HOME_SECTION_TIMEOUT", "2"))
+HOME_LATEST_LIMIT = int(os.getenv("HOME_LATEST_LIMIT", "10"))
+
+DEFAULT_LOCALE = "uz"
+LABELS = {
+    "uz": {
+        "categories": "Kategoriyalar",
+        "tags": "Teglar",
+        "latest": "So'nggi postlar",
+        "trending": "Ommabop",
+        "weather": "Ob-havo",
+    },
+    "ru": {
+        "categories": "Категории",
+        "tags": "Теги",
+        "latest": "Последние посты",
+        "trending": "Популярное",
+        "weather": "Погода",
+    },
+    "en": {
+        "categories": "Categories",
+        "tags": "Tags",
+        "latest": "Latest posts",
+        "trending": "Trending",
+        "weather": "Weather",
+    },
+}
+
+_building: dict[str, asyncio.Lock] = {}
+
+
+def negotiate_locale(accept_language: str | None) -> str:
+    """Best supported language from Accept-Language, by q-value then order."""
+    candidates = []
+    for position, part in enumerate((accept_language or "").split(",")):
+        language, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        locale = language.split("-")[0].lower()
+        if locale in LABELS and quality > 0:
+            candidates.append((-quality, position, locale))
+    return min(candidates)[2] if candidates else DEFAULT_LOCALE
+
+
+def _query(load):
+    # Sections run concurrently, so each one gets its own session.
+    with SessionLocal() as session:
+        return load(session)
+
+
+def _load_latest(session):
+    stmt = (
+        select(Post.id, Post.title, Post.slug, Post.created_at)
+        .order_by(Post.created_at.desc())
+        .limit(HOME_LATEST_LIMIT)
+    )
+    return session.execute(stmt).all()
+
+
+async def _section(name: str, awaitable):
+    try:
+        return await asyncio.wait_for(awaitable, HOME_SECTION_TIMEOUT)
+    except Exception as exc:
+        logger.warning("home section %s unavailable: %r", name, exc)
+        raise
+
+
+async def _build(locale: str) -> dict:
+    sections = {
+        "categories": run_in_threadpool(_query, _load_categories),
+        "tags": run_in_threadpool(_query, _load_tags),
+        "latest": run_in_threadpool(_query, _load_latest),
+        "trending": run_in_threadpool(trending.get_trending),
+        "weather": fetch_weather(TASHKENT_LAT, TASHKENT_LON),
+    }
+    results = await asyncio.gather(
+        *(_section(name, awaitable) for name, awaitable in sections.items()),
+        return_exceptions=True,
+    )
+
+    payload = {"locale": locale, "labels": LABELS[locale], "unavailable": []}
+    for name, result in zip(sections, results):
+        if isinstance(result, Exception):
+            payload["unavailable"].append(name)
+            result = None
+        payload[name] = result
+    return payload
+
+
+@router.get("/", response_model=HomeResponse)
+async def get_home(request: Request):
+    locale = negotiate_locale(request.headers.get("accept-language"))
+    key = ("home", locale)
+
+    entry = response_cache.responses.get(key)
+    if entry is None:
+        # One build per locale at a time; waiters reuse its result.
+        lock = _building.setdefault(locale, asyncio.Lock())
+        async with lock:
+            entry = response_cache.responses.get(key)
+            if entry is None:
+                payload = await _build(locale)
+                ttl = HOME_DEGRADED_TTL if payload["unavailable"] else HOME_CACHE_TTL
+                entry = await response_cache.store(key, HomeResponse, payload, ttl=ttl)
+
+    headers = {"Vary": "Accept-Language", "Content-Language": locale}
+    return entry.response(request.headers.get("accept-encoding"), headers)
@@ -1,27 +1,17 @@
-from typing import Annotated
-
-from fastapi import APIRouter, Header, HTTPException
+from fastapi import APIRouter, HTTPException
 from sqlalchemy import select
 
 from database import db_dep
 from models import User
+from schemas import UserResponse
+from services.auth import admin_dep, auth_dep
 
 
 router = APIRouter(prefix="/lesson", tags=["Lesson"])
 
-SECRET_TOKEN = "shamsiddin"
-
-
-@router.get("/protected/")
-async def protected_api(
-    db: db_dep, email: str, X_chesnok_token: Annotated[str | None, Header()] = None
-):
-    if not X_chesnok_token:
-        raise HTTPException(status_code=401, detail="No chesnok token provided.")
-
-    if X_chesnok_token != SECRET_TOKEN:
-        raise HTTPException(status_code=401, detail="Incorrect chesnok token.")
 
+@router.get("/protected/", response_model=UserResponse)
+async def protected_api(db: db_dep, email: str, current_user: auth_dep):
     stmt = select(User).where(User.email == email)
     res = db.execute(stmt)
     user = res.scalars().first()
@@ -32,16 +22,8 @@ async def protected_api(
     return user
 
 
-@router.get("/protected/adminonly/")
-async def protected_admin(
-    db: db_dep, email: str, X_chesnok_token: Annotated[str | None, Header()] = None
-):
-    if not X_chesnok_token:
-        raise HTTPException(status_code=401, detail="No chesnok token provided.")
-
-    if X_chesnok_token != SECRET_TOKEN:
-        raise HTTPException(status_code=401, detail="Incorrect chesnok token.")
-
+@router.get("/protected/adminonly/", response_model=UserResponse)
+async def protected_admin(db: db_dep, email: str, current_user: admin_dep):
     stmt = select(User).where(User.email == email)
     res = db.execute(stmt)
     user = res.scalars().first()
@@ -49,9 +31,6 @@ async def protected_admin(
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    if not user.is_superuser:
-        raise HTTPException(status_code=403, detail="San mani adminimmassan karochi!")
-
     return user
 
 
@@ -1,137 +1,418 @@
-from fastapi import APIRouter, HTTPException
-from sqlalchemy import select
+import os
 
-from models import Post, post_tag_m2m_table, Tag
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql
+
+from models import Like, Post, RelatedPost, post_tag_m2m_table, Tag
 from database import db_dep
-from schemas import PostCreateRequest, PostListResponse, PostUpdateRequest
-from utils import generate_slug
-from fastapi import Response, Cookie
-from typing import Optional
+from schemas import (
+    LikeResponse,
+    PostBatchResponse,
+    PostCreateRequest,
+    PostDetailResponse,
+    PostFieldsResponse,
+    PostListResponse,
+    PostUpdateRequest,
+    ReadingHistoryResponse,
+)
+from services import (
+    content,
+    feeds,
+    http_cache,
+    post_cache,
+    reading_history,
+    related,
+    response_cache,
+    trending,
+)
+from services.auth import auth_dep, optional_auth_dep
+from services.devices import device_dep, optional_device_dep
+from services.fields import allowed_columns, projection
+from services.slugs import unique_slug
+from fastapi import Response
 
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
 
-@router.get("/", response_model=list[PostListResponse])
+POST_LIST_FIELDS = allowed_columns(Post, PostFieldsResponse)
+POST_LIST_DEFAULT_FIELDS = ("id", "title", "slug", "created_at")
+
+
+POST_PAGE_SIZE = int(os.getenv("POST_PAGE_SIZE", "20"))
+POST_MAX_PAGE_SIZE = 100
+# Fields the post cache holds, so feed pages asking for them need no query.
+FEED_FIELDS = set(PostDetailResponse.model_fields)
+
+
+def post_list_statement(columns, category_id, tag_id, offset: int, limit: int):
+    stmt = select(*columns)
+
+    if category_id is not None:
+        stmt = stmt.where(Post.category_id == category_id)
+
+    if tag_id:
+        stmt = stmt.join(
+            post_tag_m2m_table, Post.id == post_tag_m2m_table.c.post_id
+        ).where(post_tag_m2m_table.c.tag_id == tag_id)
+
+    stmt = stmt.order_by(Post.created_at.desc(), Post.id.desc())
+    return stmt.offset(offset).limit(limit)
+
+
+def feed_page(session, columns, category_id, tag_id, offset, limit):
+    """A page of a single category or tag feed, or None to query instead."""
+    names = [column.key for column in columns]
+    if not set(names) <= FEED_FIELDS or (category_id is None) == (not tag_id):
+        return None
+
+    if category_id is not None:
+        ids = feeds.page(session, "category", category_id, offset, limit)
+    else:
+        ids = feeds.page(session, "tag", tag_id, offset, limit)
+    if ids is None:
+        return None
+
+    posts = post_cache.get_many(session, ids)
+    return [
+        {name: getattr(posts[post_id], name) for name in names}
+        for post_id in ids
+        if post_id in posts
+    ]
+
+
+@router.get(
+    "/", response_model=list[PostFieldsResponse], response_model_exclude_unset=True
+)
 async def get_post(
     session: db_dep,
-    slug: str,
-    is_active: bool = None,
     category_id: int | None = None,
     tag_id: int | None = None,
+    fields: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(POST_PAGE_SIZE, ge=1, le=POST_MAX_PAGE_SIZE),
 ):
-    stmt = (
-        select(Post)
-        .join(post_tag_m2m_table, Post.id == post_tag_m2m_table.c.post_id)
-        .join(Tag, post_tag_m2m_table.c.tag_id == Tag.id)
-    )
+    """Posts, newest first, with the columns named in ``fields``.
+
+    ``fields`` is a comma separated subset of the ``PostFieldsResponse``
+    fields, ``id,title,slug,created_at`` by default; ``body`` is only read
+    when listed. Recent pages of a single category or tag come from its
+    materialized feed. Only live posts are listed.
+    """
+    columns = projection(fields, POST_LIST_FIELDS, POST_LIST_DEFAULT_FIELDS)
+
+    posts = feed_page(session, columns, category_id, tag_id, offset, limit)
+    if posts is not None:
+        return posts
+
+    stmt = post_list_statement(columns, category_id, tag_id, offset, limit)
+    return [row._asdict() for row in session.execute(stmt)]
+
+
+@router.get("/trending/", response_model=list[PostListResponse])
+async def get_trending_posts(request: Request):
+    entry = response_cache.responses.get(trending.CACHE_KEY)
+    if entry is None:
+        posts = await run_in_threadpool(trending.get_trending)
+        entry = await response_cache.store(
+            trending.CACHE_KEY, list[PostListResponse], posts, ttl=trending.TRENDING_TTL
+        )
+    return entry.response(request.headers.get("accept-encoding"))
 
-    if is_active is not None:
-        stmt = stmt.where(Post.is_active == is_active)
 
-    if category_id is not None:
-        stmt = stmt.where(Post.category_id == category_id)
+POST_BATCH_MAX_ITEMS = int(os.getenv("POST_BATCH_MAX_ITEMS", "100"))
 
-    if tag_id:
-        stmt = stmt.where(Tag.id == tag_id)
 
-    stmt = stmt.order_by(Post.created_at.desc())
-    result = session.execute(stmt)
-    return result.scalars().all()
+def _batch_keys(value: str, convert) -> list:
+    try:
+        keys = [convert(k.strip()) for k in value.split(",") if k.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ids")
+    keys = list(dict.fromkeys(keys))
+    if len(keys) > POST_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {POST_BATCH_MAX_ITEMS} posts per batch",
+        )
+    return keys
 
 
-@router.get("/{slug}/", response_model=list[PostListResponse])
-async def get_post_single(slug: str, session: db_dep, is_active: bool = None):
-    stmt = select(Post).where(Post.slug == slug)
+@router.get("/batch/", response_model=PostBatchResponse)
+async def get_posts_batch(
+    session: db_dep, ids: str | None = None, slugs: str | None = None
+):
+    """Several posts in one call, by comma separated ``ids`` or ``slugs``.
+
+    Cached posts are served from the post cache; the rest come from one
+    query.
+    """
+    if (ids is None) == (slugs is None):
+        raise HTTPException(
+            status_code=400, detail="Provide either ids or slugs, not both"
+        )
 
-    if is_active is not None:
-        stmt = stmt.where(Post.is_active == is_active)
+    if ids is not None:
+        keys = _batch_keys(ids, int)
+        found = post_cache.get_many(session, keys)
+    else:
+        keys = _batch_keys(slugs, str)
+        found = post_cache.get_many_by_slug(session, keys)
 
-    stmt = stmt.order_by(Post.created_at.desc())
-    res = session.execute(stmt)
-    post = res.scalars().first()
+    return {
+        "posts": [found[key] for key in keys if key in found],
+        "missing": [key for key in keys if key not in found],
+    }
 
-    if not post:
+
+def _reader(current_user, device_id: int | None) -> tuple[str, int] | None:
+    if current_user is not None:
+        return ("user", current_user.id)
+    if device_id is not None:
+        return ("device", device_id)
+    return None
+
+
+def validators_statement(slug: str):
+    return select(Post.id, Post.updated_at).where(Post.slug == slug)
+
+
+@router.get("/{slug}/", response_model=PostDetailResponse)
+async def get_post_single(
+    slug: str,
+    request: Request,
+    session: db_dep,
+    current_user: optional_auth_dep,
+    device_id: optional_device_dep,
+):
+    # Validators come from an index-only scan; the row itself is only read
+    # when the client's copy is stale.
+    validators = session.execute(validators_statement(slug)).first()
+    if not validators:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    return post
+    post_id, updated_at = validators
+    headers = http_cache.post_headers(post_id, updated_at)
+    reading_history.record(_reader(current_user, device_id), post_id)
+
+    if http_cache.is_not_modified(request, headers["ETag"], updated_at):
+        return Response(status_code=304, headers=headers)
+
+    # The validators are part of the key, so edits never serve a stale body.
+    key = ("post", headers["ETag"])
+    entry = response_cache.responses.get(key)
+    if entry is None:
+        entry = await response_cache.store(
+            key, PostDetailResponse, session.get(Post, post_id)
+        )
+    return entry.response(request.headers.get("accept-encoding"), headers)
+
+
+def related_statement(slug: str, columns):
+    source_id = select(Post.id).where(Post.slug == slug).scalar_subquery()
+    return (
+        select(*columns)
+        .join(RelatedPost, RelatedPost.related_post_id == Post.id)
+        .where(RelatedPost.post_id == source_id, Post.is_active.is_(True))
+        .order_by(RelatedPost.rank)
+    )
+
+
+@router.get(
+    "/{slug}/related/",
+    response_model=list[PostFieldsResponse],
+    response_model_exclude_unset=True,
+)
+async def get_related_posts(slug: str, session: db_dep, fields: str | None = None):
+    columns = projection(fields, POST_LIST_FIELDS, POST_LIST_DEFAULT_FIELDS)
+    stmt = related_statement(slug, columns)
+    return [row._asdict() for row in session.execute(stmt)]
+
+
+def _set_post_tags(session, post_id: int, tag_ids: list[int]):
+    tag_ids = set(tag_ids)
+    existing = set(session.scalars(select(Tag.id).where(Tag.id.in_(tag_ids))))
+    if existing != tag_ids:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown tags: {sorted(tag_ids - existing)}"
+        )
+
+    session.execute(
+        delete(post_tag_m2m_table).where(post_tag_m2m_table.c.post_id == post_id)
+    )
+    if tag_ids:
+        session.execute(
+            insert(post_tag_m2m_table),
+            [{"post_id": post_id, "tag_id": tag_id} for tag_id in tag_ids],
+        )
+
+
+async def _set_body(post: Post, body: str):
+    post.body = body
+    for field, value in (await content.render(body)).items():
+        setattr(post, field, value)
+
+
+def _refeed(session, post: Post):
+    """Move a post to the feeds it now belongs to."""
+    feeds.remove([post.id])
+    if post.is_active and post.deleted_at is None:
+        tag_ids = session.scalars(
+            select(post_tag_m2m_table.c.tag_id).where(
+                post_tag_m2m_table.c.post_id == post.id
+            )
+        )
+        feeds.add(post.id, post.created_at, post.category_id, tag_ids)
 
 
 @router.post("/create/")
-async def create_post(session: db_dep, create_data: PostCreateRequest):
+async def create_post(
+    session: db_dep,
+    current_user: auth_dep,
+    create_data: PostCreateRequest,
+    background_tasks: BackgroundTasks,
+):
     new_post = Post(
+        user_id=current_user.id,
         title=create_data.title,
-        body=create_data.body,
-        slug=create_data.slug,
-        content=create_data.content,
+        slug=unique_slug(session, Post, create_data.slug or create_data.title),
+        category_id=create_data.category_id,
+        is_active=create_data.is_active,
     )
+    await _set_body(new_post, create_data.body)
     session.add(new_post)
+    session.flush()
+    _set_post_tags(session, new_post.id, create_data.tag_ids)
     session.commit()
     session.refresh(new_post)
 
+    if new_post.is_active:
+        feeds.add(
+            new_post.id,
+            new_post.created_at,
+            new_post.category_id,
+            create_data.tag_ids,
+        )
+    background_tasks.add_task(related.rebuild_for_posts, [new_post.id])
     return new_post
 
 
 @router.put("/post_id/")
-async def post_update(post_id: int, update_data: PostUpdateRequest, session: db_dep):
-    stmt = select(Post).where(Post.id == post_id)
+async def post_update(
+    post_id: int,
+    update_data: PostUpdateRequest,
+    session: db_dep,
+    background_tasks: BackgroundTasks,
+):
+    # Authors can still edit drafts, so only deleted posts are hidden.
+    stmt = (
+        select(Post).where(Post.id == post_id).execution_options(include_inactive=True)
+    )
     result = session.execute(stmt)
     post = result.scalars().first()
 
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    if update_data.title:
+    if update_data.title and update_data.title != post.title:
         post.title = update_data.title
-        post.slug = generate_slug(update_data.title)
+        post.slug = unique_slug(session, Post, update_data.title, exclude_id=post.id)
 
     if update_data.body is not None:
-        post.body = update_data.body
+        await _set_body(post, update_data.body)
 
     if update_data.is_active:
         post.is_active = update_data.is_active
 
+    retagged = update_data.tag_ids is not None or (
+        update_data.category_id is not None
+        and update_data.category_id != post.category_id
+    )
+    if update_data.category_id is not None:
+        post.category_id = update_data.category_id
+
+    if update_data.tag_ids is not None:
+        _set_post_tags(session, post.id, update_data.tag_ids)
+
     session.commit()
     session.refresh(post)
 
+    post_cache.invalidate([post.id])
+    if retagged or update_data.is_active:
+        _refeed(session, post)
+    background_tasks.add_task(http_cache.purge_posts, [post.id])
+    if retagged:
+        background_tasks.add_task(related.rebuild_for_posts, [post.id])
+
 
 @router.patch("/post_id/")
 async def post_update_patch(
-    session: db_dep, post_id: int, update_data: PostUpdateRequest
+    session: db_dep,
+    post_id: int,
+    update_data: PostUpdateRequest,
+    background_tasks: BackgroundTasks,
 ):
-    stmt = select(Post).where(Post.id == post_id)
+    # Authors can still edit drafts, so only deleted posts are hidden.
+    stmt = (
+        select(Post).where(Post.id == post_id).execution_options(include_inactive=True)
+    )
     result = session.execute(stmt)
     post = result.scalars().first()
 
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    if update_data.title:
+    if update_data.title and update_data.title != post.title:
         post.title = update_data.title
-        post.slug = generate_slug(update_data.title)
+        post.slug = unique_slug(session, Post, update_data.title, exclude_id=post.id)
 
     if update_data.body is not None:
-        post.body = update_data.body
+        await _set_body(post, update_data.body)
 
     if update_data.is_active:
         post.is_active = update_data.is_active
 
+    retagged = update_data.tag_ids is not None or (
+        update_data.category_id is not None
+        and update_data.category_id != post.category_id
+    )
+    if update_data.category_id is not None:
+        post.category_id = update_data.category_id
+
+    if update_data.tag_ids is not None:
+        _set_post_tags(session, post.id, update_data.tag_ids)
+
     session.commit()
     session.refresh(post)
 
+    post_cache.invalidate([post.id])
+    if retagged or update_data.is_active:
+        _refeed(session, post)
+    background_tasks.add_task(http_cache.purge_posts, [post.id])
+    if retagged:
+        background_tasks.add_task(related.rebuild_for_posts, [post.id])
+
 
 @router.delete("/post_id/", status_code=204)
-async def post_delete(post_id: int, session: db_dep):
-    stmt = select(Post).where(Post.id == post_id)
+async def post_delete(post_id: int, session: db_dep, background_tasks: BackgroundTasks):
+    stmt = (
+        select(Post).where(Post.id == post_id).execution_options(include_inactive=True)
+    )
     result = session.execute(stmt)
     db_post = result.scalars().first()
 
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    session.delete(db_post)
+    # Soft delete; services.compactor removes the row and its children later.
+    db_post.deleted_at = func.now()
     session.commit()
 
+    post_cache.invalidate([post_id])
+    feeds.remove([post_id])
+    background_tasks.add_task(http_cache.purge_posts, [post_id])
+
     return {"message": f"ID {post_id} successfully deleted doneeeee !!!."}
 
 
@@ -156,20 +437,55 @@ async def get_weather(lat: float, lon: float):
         }
 
 
-@router.post("/{slug}/like")
-async def like_post(
-    slug: str, response: Response, liked_posts: Optional[str] = Cookie(None)
-):
-    current_likes = liked_posts.split(",") if liked_posts else []
+def _liked_post_id(session, slug: str) -> int:
+    post_id = session.scalar(select(Post.id).where(Post.slug == slug))
+    if post_id is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return post_id
 
-    if slug not in current_likes:
-        current_likes.append(slug)
-        response.set_cookie(
-            key="liked_posts", value=",".join(current_likes), max_age=2592000
-        )
-        return {"message": "Postga like bosildi"}
 
-    return {"message": "Siz allaqachon like bosgansiz"}
+def _likes_count(session, post_id: int, delta: int) -> int:
+    if not delta:
+        return session.scalar(select(Post.likes_count).where(Post.id == post_id))
+    stmt = (
+        update(Post)
+        .where(Post.id == post_id)
+        # Keeps updated_at, so a like does not change the post's validators.
+        .values(likes_count=Post.likes_count + delta, updated_at=Post.updated_at)
+        .returning(Post.likes_count)
+        .execution_options(synchronize_session=False)
+    )
+    return session.execute(stmt).scalar_one()
+
+
+@router.post("/{slug}/like", response_model=LikeResponse)
+async def like_post(slug: str, session: db_dep, device_id: device_dep):
+    post_id = _liked_post_id(session, slug)
+    # The unique (post_id, device_id) index makes repeated likes a no-op.
+    stmt = (
+        postgresql.insert(Like)
+        .values(post_id=post_id, device_id=device_id)
+        .on_conflict_do_nothing(index_elements=[Like.post_id, Like.device_id])
+        .returning(Like.id)
+    )
+    inserted = session.execute(stmt).first() is not None
+    likes_count = _likes_count(session, post_id, 1 if inserted else 0)
+    session.commit()
+    return {"liked": True, "likes_count": likes_count}
+
+
+@router.delete("/{slug}/like", response_model=LikeResponse)
+async def unlike_post(slug: str, session: db_dep, device_id: device_dep):
+    post_id = _liked_post_id(session, slug)
+    stmt = (
+        delete(Like)
+        .where(Like.post_id == post_id, Like.device_id == device_id)
+        .returning(Like.id)
+    )
+    deleted = session.execute(stmt).first() is not None
+    likes_count = _likes_count(session, post_id, -1 if deleted else 0)
+    session.commit()
+    return {"liked": False, "likes_count": likes_count}
 
 
 @router.post("/{slug}/comment-draft")
@@ -188,13 +504,25 @@ async def set_view_mode(mode: str, response: Response):
     return {"message": f"Ko'rinish {mode} rejimiga o'tkazildi"}
 
 
-@router.get("/history/recent")
-async def get_reading_history(reading_history: Optional[str] = Cookie(None)):
-    if not reading_history:
+def history_statement(post_ids: list[int]):
+    return select(Post.id, Post.title, Post.slug, Post.created_at).where(
+        Post.id.in_(post_ids), Post.is_active.is_(True)
+    )
+
+
+@router.get("/history/recent", response_model=ReadingHistoryResponse)
+async def get_reading_history(
+    session: db_dep,
+    current_user: optional_auth_dep,
+    device_id: optional_device_dep,
+):
+    owner = _reader(current_user, device_id)
+    post_ids = reading_history.load(session, owner) if owner else []
+    if not post_ids:
         return {"history": []}
 
-    history_ids = reading_history.split("|")
-    return {"recent_post_ids": history_ids}
+    posts = {post.id: post for post in session.execute(history_statement(post_ids))}
+    return {"history": [posts[i] for i in post_ids if i in posts]}
 
 
 @router.post("/hide-banner")
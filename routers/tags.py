@@ -1,13 +1,39 @@
-from fastapi import APIRouter, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Request
 from sqlalchemy import select
 
 from models import Tag
 from database import db_dep
 from schemas import TagCreateRequest, TagListResponse, TagUpdateRequest
-from utils import generate_slug
+from services import response_cache
+from services.slugs import unique_slug
 
 router = APIRouter(prefix="/tag", tags=["Tag"])
 
+CACHE_KEY = "tags"
+POPULAR_CACHE_KEY = (CACHE_KEY, "popular")
+
+
+def _load_tags(session, sort: str = "name"):
+    stmt = select(Tag)
+    if sort == "popular":
+        stmt = stmt.order_by(Tag.post_count.desc(), Tag.name)
+    else:
+        stmt = stmt.order_by(Tag.name)
+    return session.execute(stmt).scalars().all()
+
+
+@router.get("/list/", response_model=list[TagListResponse])
+async def get_tags(
+    session: db_dep, request: Request, sort: Literal["name", "popular"] = "name"
+):
+    key = POPULAR_CACHE_KEY if sort == "popular" else CACHE_KEY
+    entry = await response_cache.get_or_build(
+        session, key, list[TagListResponse], lambda session: _load_tags(session, sort)
+    )
+    return entry.response(request.headers.get("accept-encoding"))
+
 
 @router.get("/{slug}", response_model=TagListResponse)
 async def get_tag(session: db_dep, slug: str):
@@ -25,12 +51,13 @@ async def get_tag(session: db_dep, slug: str):
 async def tag_create(session: db_dep, create_data: TagCreateRequest):
     tag = Tag(
         name=create_data.name,
-        slug=generate_slug(create_data.name),
+        slug=unique_slug(session, Tag, create_data.name),
     )
 
     session.add(tag)
     session.commit()
     session.refresh(tag)
+    response_cache.invalidate(CACHE_KEY, POPULAR_CACHE_KEY)
 
     return tag
 
@@ -44,11 +71,13 @@ async def tag_update_put(session: db_dep, tag_id: int, update_data: TagUpdateReq
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
 
-    tag.name = update_data.name
-    tag.slug = generate_slug(update_data.name)
+    if update_data.name and update_data.name != tag.name:
+        tag.name = update_data.name
+        tag.slug = unique_slug(session, Tag, update_data.name, exclude_id=tag.id)
 
     session.commit()
     session.refresh(tag)
+    response_cache.invalidate(CACHE_KEY, POPULAR_CACHE_KEY)
 
     return tag
 
@@ -62,11 +91,13 @@ async def tag_update_patch(session: db_dep, tag_id: int, update_data: TagUpdateR
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
 
-    tag.name = update_data.name
-    tag.slug = generate_slug(update_data.name)
+    if update_data.name and update_data.name != tag.name:
+        tag.name = update_data.name
+        tag.slug = unique_slug(session, Tag, update_data.name, exclude_id=tag.id)
 
     session.commit()
     session.refresh(tag)
+    response_cache.invalidate(CACHE_KEY, POPULAR_CACHE_KEY)
 
     return tag
 
@@ -82,3 +113,4 @@ async def delete_tag(session: db_dep, tag_id: int):
 
     session.delete(tag)
     session.commit()
+    response_cache.invalidate(CACHE_KEY, POPULAR_CACHE_KEY)
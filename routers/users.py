@@ -4,6 +4,7 @@ from sqlalchemy import select
 from database import db_dep
 from models import User
 from schemas import UserCreateRequest, UserResponse
+from services.auth import hash_password
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -23,7 +24,9 @@ async def get_profile(db: db_dep, email: str):
 
 @router.post("/create/", response_model=UserResponse)
 async def users_create(db: db_dep, user_data: UserCreateRequest):
-    new_user = User(email=user_data.email, password_hash=user_data.password)
+    new_user = User(
+        email=user_data.email, password=await hash_password(user_data.password)
+    )
 
     db.add(new_user)
     db.commit()
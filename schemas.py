@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 class BaseConfigModel(BaseModel):
@@ -11,9 +11,11 @@ class BaseConfigModel(BaseModel):
 class PostCreateRequest(BaseConfigModel):
     title: str
     body: str
-    slug: str
-    content: str
+    # Derived from the title when left out.
+    slug: str | None = None
     is_active: bool = True
+    category_id: int | None = None
+    tag_ids: list[int] = []
 
 
 class PostListResponse(BaseConfigModel):
@@ -23,10 +25,78 @@ class PostListResponse(BaseConfigModel):
     created_at: datetime
 
 
+class PostFieldsResponse(BaseModel):
+    """A post list item with only the requested ``fields=``."""
+
+    id: int | None = None
+    title: str | None = None
+    slug: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    user_id: int | None = None
+    category_id: int | None = None
+    is_active: bool | None = None
+    excerpt: str | None = None
+    word_count: int | None = None
+    mins_read: int | None = None
+    views_count: int | None = None
+    likes_count: int | None = None
+    comments_count: int | None = None
+    body: str | None = None
+    body_html: str | None = None
+
+
+class PostDetailResponse(PostListResponse):
+    body_html: str | None = None
+    excerpt: str | None = None
+    word_count: int = 0
+    mins_read: int = 0
+
+
+class PostBatchResponse(BaseModel):
+    # In the requested order, each requested post at most once.
+    posts: list[PostDetailResponse]
+    # Requested ids or slugs that are unknown, deleted or unpublished.
+    missing: list[int | str] = []
+
+
+class ReadingHistoryResponse(BaseConfigModel):
+    history: list[PostListResponse]
+
+
+class LikeResponse(BaseModel):
+    liked: bool
+    likes_count: int
+
+
+class CommentCreateRequest(BaseModel):
+    post_id: int
+    text: str = Field(min_length=1, max_length=5000)
+    parent_id: int | None = None
+
+
+class CommentResponse(BaseConfigModel):
+    id: int
+    post_id: int
+    parent_id: int | None = None
+    user_id: int | None = None
+    depth: int
+    text: str
+    created_at: datetime
+
+
+class CommentPageResponse(BaseModel):
+    comments: list[CommentResponse]
+    # Pass as ``after`` to get the next page; null on the last page.
+    next_cursor: str | None = None
+
+
 class PostUpdateRequest(BaseConfigModel):
     title: str | None = None
     body: str | None = None
     is_active: bool | None = None
+    category_id: int | None = None
+    tag_ids: list[int] | None = None
 
 
 class TagCreateRequest(BaseModel):
@@ -42,17 +112,31 @@ class TagListResponse(BaseModel):
     id: int
     name: str
     slug: str
+    post_count: int = 0
 
 
 class CategoryListResonse(BaseModel):
     id: int | None = None
     name: str | None = None
+    post_count: int = 0
 
 
 class CategoryCreateRequest(BaseModel):
     name: str | None = None
 
 
+class HomeResponse(BaseModel):
+    locale: str
+    labels: dict[str, str]
+    categories: list[CategoryListResonse] | None = None
+    tags: list[TagListResponse] | None = None
+    latest: list[PostListResponse] | None = None
+    trending: list[PostListResponse] | None = None
+    weather: dict | None = None
+    # Sections that failed or timed out; they are null above.
+    unavailable: list[str] = []
+
+
 class ProfessionCreateRequest(BaseModel):
     name: str
 
@@ -111,8 +195,90 @@ class UserCreateRequest(BaseModel):
     password: str
 
 
+class LoginRequest(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: datetime
+
+
 class UserResponse(BaseModel):
     id: int
     email: EmailStr
     first_name: str | None = None
     last_name: str | None = None
+
+
+class AuthorStatsResponse(BaseConfigModel):
+    id: int
+    first_name: str | None = None
+    posts: int
+    views: int
+    likes: int
+    comments: int
+
+
+class AuthorProfileResponse(AuthorStatsResponse):
+    bio: str | None = None
+
+
+class PostImportRow(BaseModel):
+    title: str
+    # CSV drops empty cells, so an exported empty body comes back missing.
+    body: str = ""
+    user_id: int
+    slug: str | None = None
+    category: str | None = None
+    tags: list[str] = []
+    is_active: bool = True
+    created_at: datetime | None = None
+
+
+class TagImportRow(BaseModel):
+    name: str
+    slug: str | None = None
+
+
+class CategoryImportRow(BaseModel):
+    name: str
+    slug: str | None = None
+
+
+class BulkImportError(BaseModel):
+    line: int
+    error: str
+
+
+class BulkImportReport(BaseModel):
+    entity: str
+    rows: int
+    imported: int
+    failed: int
+    errors: list[BulkImportError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+class ModerationFilter(BaseModel):
+    user_id: int | None = None
+    post_id: int | None = None
+    category_id: int | None = None
+    is_active: bool | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+
+
+class ModerationRequest(BaseModel):
+    ids: list[int] | None = None
+    filter: ModerationFilter | None = None
+
+
+class ModerationResponse(BaseModel):
+    entity: str
+    action: str
+    affected: int
+    ids: list[int]
@@ -0,0 +1,36 @@
+"""Production launcher: gunicorn managing uvicorn workers.
+
+python serve.py              # same as: gunicorn -c gunicorn.conf.py main:app
+WEB_CONCURRENCY=4 DB_MAX_CONNECTIONS=80 python serve.py
+"""
+
+import os
+import sys
+
+from uvicorn_worker import UvicornWorker
+
+
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        # Long-lived feed streams are cut before gunicorn's graceful timeout
+        # kills the worker, so the lifespan shutdown still flushes buffers.
+        "timeout_graceful_shutdown": max(1, GRACEFUL_TIMEOUT - 10),
+    }
+
+
+def main():
+    config = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py"
+    )
+    args = [sys.executable, "-m", "gunicorn", "-c", config, *sys.argv[1:], "main:app"]
+    os.execv(sys.executable, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+import warnings
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cache
+from typing import Annotated
+
+import anyio
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from fastapi import Cookie, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import delete, select
+
+from database import SessionLocal
+from models import User, UserSession
+from services.cache import TTLCache
+
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+SESSION_COOKIE_NAME = "session"
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "4"))
+SESSION_CLEANUP_INTERVAL = float(os.getenv("SESSION_CLEANUP_INTERVAL", "3600"))
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+
+if not SECRET_KEY:
+    # A per-process key only works with a single worker, so it is for
+    # local development; every worker needs the same key in production.
+    if not DEBUG:
+        raise RuntimeError("SECRET_KEY must be set unless DEBUG is enabled")
+    warnings.warn("SECRET_KEY is not set, sessions will not survive a restart")
+    SECRET_KEY = secrets.token_urlsafe(32)
+
+_hasher = PasswordHasher()
+# argon2 uses ~64MB per hash, so hashing gets its own small thread limit
+# instead of sharing the default threadpool with request handlers.
+_hash_limiter = anyio.CapacityLimiter(HASH_CONCURRENCY)
+
+# Validated sessions are cached for AUTH_CACHE_TTL seconds, so a logout on
+# another worker takes at most that long to be noticed there.
+session_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    id: int
+    email: str
+    is_staff: bool
+    is_superuser: bool
+    session_id: str
+
+
+async def hash_password(password: str) -> str:
+    return await anyio.to_thread.run_sync(_hasher.hash, password, limiter=_hash_limiter)
+
+
+@cache
+def _dummy_hash() -> str:
+    return _hasher.hash(secrets.token_urlsafe(16))
+
+
+def _verify(password_hash: str | None, password: str) -> bool:
+    try:
+        _hasher.verify(password_hash or _dummy_hash(), password)
+    except (VerificationError, InvalidHashError):
+        return False
+    return password_hash is not None
+
+
+async def verify_password(password_hash: str | None, password: str) -> bool:
+    """Check ``password``; a missing hash still costs one verification."""
+    return await anyio.to_thread.run_sync(
+        _verify, password_hash, password, limiter=_hash_limiter
+    )
+
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def make_token(session_id: str, expires_at: int) -> str:
+    payload = f"{session_id}.{expires_at}"
+    return f"{payload}.{_sign(payload)}"
+
+
+def read_token(token: str) -> str | None:
+    """Return the session id of a well-signed, unexpired token."""
+    try:
+        session_id, expires_at, signature = token.split(".")
+        expired = int(expires_at) < time.time()
+    except ValueError:
+        return None
+
+    if expired or not hmac.compare_digest(
+        signature, _sign(f"{session_id}.{expires_at}")
+    ):
+        return None
+    return session_id
+
+
+def create_session(session, user: User) -> tuple[str, datetime]:
+    expires_at = int(time.time()) + SESSION_TTL_SECONDS
+    expires = datetime.fromtimestamp(expires_at, timezone.utc)
+    session_id = secrets.token_urlsafe(24)
+
+    session.add(UserSession(id=session_id, user_id=user.id, expires_at=expires))
+    session.commit()
+    return make_token(session_id, expires_at), expires
+
+
+def revoke_session(session, session_id: str):
+    session.execute(delete(UserSession).where(UserSession.id == session_id))
+    session.commit()
+    session_cache.pop(session_id)
+
+
+def revoke_user_sessions(session, user_ids: list[int]) -> int:
+    """Log ``user_ids`` out everywhere, e.g. after they are banned."""
+    stmt = (
+        delete(UserSession)
+        .where(UserSession.user_id.in_(user_ids))
+        .returning(UserSession.id)
+    )
+    session_ids = session.execute(stmt).scalars().all()
+    session.commit()
+    for session_id in session_ids:
+        session_cache.pop(session_id)
+    return len(session_ids)
+
+
+def purge_expired_sessions() -> int:
+    with SessionLocal() as session:
+        result = session.execute(
+            delete(UserSession).where(
+                UserSession.expires_at <= datetime.now(timezone.utc)
+            )
+        )
+        session.commit()
+    return result.rowcount
+
+
+def session_user_statement(session_id: str):
+    return (
+        select(User.id, User.email, User.is_staff, User.is_superuser)
+        .join(UserSession, UserSession.user_id == User.id)
+        .where(
+            UserSession.id == session_id,
+            UserSession.expires_at > datetime.now(timezone.utc),
+            User.is_active.is_(True),
+            User.is_deleted.is_(False),
+        )
+    )
+
+
+def _load_session_user(session_id: str) -> AuthUser | None:
+    with SessionLocal() as session:
+        row = session.execute(session_user_statement(session_id)).first()
+
+    if row is None:
+        return None
+    return AuthUser(*row, session_id=session_id)
+
+
+async def get_current_user(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(_bearer)],
+    session_token: Annotated[str | None, Cookie(alias=SESSION_COOKIE_NAME)] = None,
+) -> AuthUser:
+    token = credentials.credentials if credentials else session_token
+    session_id = read_token(token) if token else None
+    if session_id is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    user = session_cache.get(session_id)
+    if user is None:
+        user = await run_in_threadpool(_load_session_user, session_id)
+        if user is None:
+            raise HTTPException(status_code=401, detail="Session expired")
+        session_cache.set(session_id, user)
+
+    return user
+
+
+async def get_optional_user(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(_bearer)],
+    session_token: Annotated[str | None, Cookie(alias=SESSION_COOKIE_NAME)] = None,
+) -> AuthUser | None:
+    if not (credentials or session_token):
+        return None
+    try:
+        return await get_current_user(credentials, session_token)
+    except HTTPException:
+        return None
+
+
+async def get_admin_user(
+    user: Annotated[AuthUser, Depends(get_current_user)],
+) -> AuthUser:
+    if not (user.is_superuser or user.is_staff):
+        raise HTTPException(status_code=403, detail="Admins only")
+    return user
+
+
+auth_dep = Annotated[AuthUser, Depends(get_current_user)]
+optional_auth_dep = Annotated[AuthUser | None, Depends(get_optional_user)]
+admin_dep = Annotated[AuthUser, Depends(get_admin_user)]
@@ -0,0 +1,71 @@
+"""Author statistics from the ``author_stats`` materialized view.
+
+The view aggregates live posts per author (posts, views, likes received,
+comments received). It is refreshed CONCURRENTLY by a scheduled job, so
+readers are never blocked, and request handlers only read it by key.
+
+    python -m services.author_stats   # refresh now
+"""
+
+import logging
+import os
+
+from sqlalchemy import func, select, text
+
+from database import SessionLocal
+from models import AuthorStats, User
+
+
+logger = logging.getLogger(__name__)
+
+AUTHOR_STATS_REFRESH_INTERVAL = float(os.getenv("AUTHOR_STATS_REFRESH_INTERVAL", "600"))
+
+# users.post_count is denormalized from the view on every refresh.
+_SYNC_POST_COUNT_SQL = text("""
+UPDATE users SET post_count = coalesce(s.posts, 0)
+FROM users u LEFT JOIN author_stats s ON s.user_id = u.id
+WHERE users.id = u.id AND users.post_count IS DISTINCT FROM coalesce(s.posts, 0)
+""")
+
+_columns = (
+    User.id,
+    User.first_name,
+    func.coalesce(AuthorStats.posts, 0).label("posts"),
+    func.coalesce(AuthorStats.views, 0).label("views"),
+    func.coalesce(AuthorStats.likes, 0).label("likes"),
+    func.coalesce(AuthorStats.comments, 0).label("comments"),
+)
+
+
+def refresh():
+    with SessionLocal() as session:
+        session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY author_stats"))
+        synced = session.execute(_SYNC_POST_COUNT_SQL).rowcount
+        session.commit()
+    logger.info("author stats refreshed, %d post counts updated", synced)
+
+
+def top(session, metric: str, limit: int) -> list:
+    order = getattr(AuthorStats, metric)
+    stmt = (
+        select(*_columns)
+        .select_from(AuthorStats)
+        .join(User, User.id == AuthorStats.user_id)
+        .order_by(order.desc(), AuthorStats.user_id)
+        .limit(limit)
+    )
+    return session.execute(stmt).all()
+
+
+def profile(session, user_id: int):
+    stmt = (
+        select(*_columns, User.bio)
+        .outerjoin(AuthorStats, AuthorStats.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    return session.execute(stmt).first()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    refresh()
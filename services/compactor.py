@@ -0,0 +1,100 @@
+"""Purge soft-deleted rows once SOFT_DELETE_RETENTION_DAYS have passed.
+
+Deletes are flag updates (``deleted_at``) on the request path; this removes
+the rows and their dependants later, in small batches.
+
+    python -m services.compactor
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+
+from database import SessionLocal
+from models import (
+    Comment,
+    Like,
+    Post,
+    PostMedia,
+    RelatedPost,
+    post_tag_m2m_table,
+)
+
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = int(os.getenv("SOFT_DELETE_RETENTION_DAYS", "30"))
+COMPACTOR_BATCH_SIZE = int(os.getenv("COMPACTOR_BATCH_SIZE", "1000"))
+COMPACTOR_INTERVAL = float(os.getenv("COMPACTOR_INTERVAL", "3600"))
+
+POST_CHILDREN = [
+    post_tag_m2m_table.c.post_id,
+    PostMedia.post_id,
+    Like.post_id,
+    Comment.post_id,
+    RelatedPost.post_id,
+    RelatedPost.related_post_id,
+]
+
+
+def delete_with_children(model, children):
+    """Build ``DELETE model WHERE id IN selected`` that also removes children.
+
+    Children are removed in data-modifying CTEs of the same statement; the
+    NO ACTION foreign keys are only checked once it completes.
+    """
+
+    def build(selected):
+        stmt = delete(model).where(model.id.in_(selected)).returning(model.id)
+        for column in children:
+            stmt = stmt.add_cte(
+                delete(column.table)
+                .where(column.in_(selected))
+                .cte(f"delete_{column.table.name}_{column.name}")
+            )
+        return stmt
+
+    return build
+
+
+def _purge(session, model, build, cutoff) -> int:
+    purged = 0
+    while True:
+        selected = (
+            select(model.id)
+            .where(model.deleted_at < cutoff)
+            .order_by(model.deleted_at)
+            .limit(COMPACTOR_BATCH_SIZE)
+            .cte("selected")
+        )
+        stmt = build(select(selected.c.id)).execution_options(synchronize_session=False)
+        ids = session.execute(stmt).scalars().all()
+        session.commit()
+
+        purged += len(ids)
+        if len(ids) < COMPACTOR_BATCH_SIZE:
+            return purged
+
+
+def compact() -> dict:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
+    with SessionLocal() as session:
+        result = {
+            "comments": _purge(
+                session, Comment, delete_with_children(Comment, []), cutoff
+            ),
+            "posts": _purge(
+                session, Post, delete_with_children(Post, POST_CHILDREN), cutoff
+            ),
+        }
+
+    if any(result.values()):
+        logger.info("compactor purged %s", result)
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(compact())
@@ -0,0 +1,164 @@
+import gzip
+import os
+from dataclasses import dataclass, field
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional, install the "brotli" extra
+    brotli = None
+
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+# Precompressed cache entries are encoded once, so they can afford more effort.
+PRECOMPRESS_GZIP_LEVEL = int(os.getenv("PRECOMPRESS_GZIP_LEVEL", "9"))
+PRECOMPRESS_BROTLI_QUALITY = int(os.getenv("PRECOMPRESS_BROTLI_QUALITY", "11"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+STREAMING_TYPES = ("text/event-stream",)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, precompress: bool = False) -> bytes:
+    if encoding == "br":
+        quality = PRECOMPRESS_BROTLI_QUALITY if precompress else BROTLI_QUALITY
+        return brotli.compress(body, quality=quality)
+    level = PRECOMPRESS_GZIP_LEVEL if precompress else GZIP_LEVEL
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _weak(etag: str) -> str:
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+@dataclass
+class Precompressed:
+    """A response body encoded once with every supported encoding."""
+
+    body: bytes
+    media_type: str = "application/json"
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def encode(cls, body: bytes, media_type: str = "application/json"):
+        variants = {}
+        if len(body) >= COMPRESSION_MIN_SIZE:
+            for encoding in supported_encodings():
+                compressed = compress(body, encoding, precompress=True)
+                if len(compressed) < len(body):
+                    variants[encoding] = compressed
+        return cls(body=body, media_type=media_type, variants=variants)
+
+    def response(
+        self, accept_encoding: str | None, headers: dict[str, str] | None = None
+    ) -> Response:
+        headers = dict(headers or {})
+        body = self.body
+        if self.variants:
+            vary = headers.get("Vary")
+            headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+            encoding = negotiate(accept_encoding)
+            if encoding in self.variants:
+                body = self.variants[encoding]
+                headers["Content-Encoding"] = encoding
+                if "ETag" in headers:
+                    headers["ETag"] = _weak(headers["ETag"])
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+
+class CompressionMiddleware:
+    """Compress single-message responses above COMPRESSION_MIN_SIZE.
+
+    Responses that are already encoded (precompressed cache hits) and
+    streaming responses (exports, live feeds) are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal start, passthrough
+
+            if message["type"] == "http.response.start":
+                start = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or content_type.startswith(STREAMING_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                return
+
+            if passthrough or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                passthrough = True
+            elif len(body) >= self.minimum_size:
+                compressed = compress(body, encoding)
+                if len(compressed) < len(body):
+                    headers = MutableHeaders(raw=list(start["headers"]))
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(compressed))
+                    headers.add_vary_header("Accept-Encoding")
+                    if "etag" in headers:
+                        headers["ETag"] = _weak(headers["etag"])
+                    start = {**start, "headers": headers.raw}
+                    message = {**message, "body": compressed}
+
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, wrapped_send)
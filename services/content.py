@@ -0,0 +1,167 @@
+"""Render post bodies and derive their excerpt and reading time.
+
+Bodies are stored as written (Markdown, optionally with inline HTML). On
+every create or update the body is rendered to sanitized HTML and the plain
+text gives the excerpt, word count and ``mins_read``; all four are stored on
+the post so reads never render. Large bodies are processed in a process pool
+so they neither block the event loop nor hold the GIL.
+
+    python -m services.content   # reprocess every post
+"""
+
+import asyncio
+import html
+import logging
+import math
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import nh3
+from markdown_it import MarkdownIt
+from sqlalchemy import select, text
+
+from database import SessionLocal
+from models import Post
+from services import http_cache, post_cache, response_cache
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_WORKERS = int(os.getenv("CONTENT_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Below this many characters rendering is cheaper than the round trip to the
+# pool, so it happens inline.
+CONTENT_INLINE_LIMIT = int(os.getenv("CONTENT_INLINE_LIMIT", "4000"))
+CONTENT_BACKFILL_CHUNK_SIZE = int(os.getenv("CONTENT_BACKFILL_CHUNK_SIZE", "500"))
+EXCERPT_LENGTH = int(os.getenv("EXCERPT_LENGTH", "280"))
+WORDS_PER_MINUTE = int(os.getenv("WORDS_PER_MINUTE", "200"))
+
+_markdown = MarkdownIt("commonmark").enable(["table", "strikethrough"])
+_whitespace = re.compile(r"\s+")
+
+_pool: ProcessPoolExecutor | None = None
+
+# Only posts whose rendering changed are written, and those get a new
+# updated_at so their validators (ETag, Last-Modified) change with the body.
+_BACKFILL_SQL = text("""
+UPDATE posts SET
+    body_html = v.body_html,
+    excerpt = v.excerpt,
+    word_count = v.word_count,
+    mins_read = v.mins_read,
+    updated_at = now()
+FROM unnest(
+    CAST(:ids AS BIGINT[]),
+    CAST(:body_html AS TEXT[]),
+    CAST(:excerpt AS TEXT[]),
+    CAST(:word_count AS INTEGER[]),
+    CAST(:mins_read AS BIGINT[])
+) AS v(id, body_html, excerpt, word_count, mins_read)
+WHERE posts.id = v.id
+    AND (posts.body_html, posts.excerpt, posts.word_count, posts.mins_read)
+    IS DISTINCT FROM (v.body_html, v.excerpt, v.word_count, v.mins_read)
+""")
+
+
+def _excerpt(text: str) -> str:
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text[:EXCERPT_LENGTH].rsplit(" ", 1)[0]
+    return cut.rstrip(",.;:-") + "…"
+
+
+def process(body: str) -> dict:
+    """Rendered fields for ``body``, in the shape of the ``Post`` columns."""
+    body_html = nh3.clean(
+        _markdown.render(body or ""), link_rel="noopener noreferrer nofollow"
+    )
+    text = html.unescape(nh3.clean(body_html, tags=set()))
+    text = _whitespace.sub(" ", text).strip()
+    word_count = len(text.split())
+    return {
+        "body_html": body_html,
+        "excerpt": _excerpt(text),
+        "word_count": word_count,
+        "mins_read": math.ceil(word_count / WORDS_PER_MINUTE),
+    }
+
+
+def pool() -> ProcessPoolExecutor:
+    # Created on first use so every server worker gets its own. Workers are
+    # spawned, not forked: the parent has threads and open connections.
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=CONTENT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def render(body: str) -> dict:
+    if len(body) < CONTENT_INLINE_LIMIT:
+        return process(body)
+    return await asyncio.get_running_loop().run_in_executor(pool(), process, body)
+
+
+def render_many(bodies: list[str]) -> list[dict]:
+    """Process a batch across the pool; blocks, so call it from a thread."""
+    if not bodies:
+        return []
+    chunksize = max(1, len(bodies) // (CONTENT_WORKERS * 4))
+    return list(pool().map(process, bodies, chunksize=chunksize))
+
+
+def backfill() -> int:
+    """Reprocess every post, deleted and inactive ones included.
+
+    Posts are read in id order, one chunk per transaction. The next chunk is
+    read while the pool is still rendering the current one. If any post
+    changed, the caches are dropped and every post is purged at the CDN.
+    """
+    stmt = (
+        select(Post.id, Post.body)
+        .order_by(Post.id)
+        .limit(CONTENT_BACKFILL_CHUNK_SIZE)
+        .execution_options(include_inactive=True, include_deleted=True)
+    )
+    chunksize = max(1, CONTENT_BACKFILL_CHUNK_SIZE // (CONTENT_WORKERS * 4))
+    processed = changed = 0
+
+    with SessionLocal() as session:
+        rows = session.execute(stmt).all()
+        while rows:
+            ids = [row.id for row in rows]
+            results = pool().map(
+                process, [row.body for row in rows], chunksize=chunksize
+            )
+            rows = session.execute(stmt.where(Post.id > ids[-1])).all()
+
+            results = list(results)
+            params = {"ids": ids}
+            for name in ("body_html", "excerpt", "word_count", "mins_read"):
+                params[name] = [fields[name] for fields in results]
+            changed += session.execute(_BACKFILL_SQL, params).rowcount
+            session.commit()
+            processed += len(ids)
+            logger.info("content backfill: %s posts, %s changed", processed, changed)
+
+    shutdown()
+    if changed:
+        post_cache.clear()
+        response_cache.responses.clear()
+        asyncio.run(http_cache.purge([http_cache.ALL_POSTS_KEY]))
+    return processed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(backfill())
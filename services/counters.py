@@ -0,0 +1,97 @@
+"""Reconcile the denormalized ``post_count`` of categories and tags.
+
+Triggers on ``posts`` and ``post_tags`` keep the counts current as posts are
+published, retagged, deactivated or deleted (see the add_post_counts
+migration). This job recomputes them chunk by chunk, each chunk in its own
+short transaction, to repair any drift, e.g. from hard deletes of live posts
+or from data loaded with triggers disabled.
+
+    python -m services.counters
+"""
+
+import logging
+import os
+
+from sqlalchemy import text
+
+from database import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_CHUNK_SIZE = int(os.getenv("POST_COUNT_RECONCILE_CHUNK_SIZE", "500"))
+RECONCILE_INTERVAL = float(os.getenv("POST_COUNT_RECONCILE_INTERVAL", "3600"))
+
+# Each statement takes the ids after :last_id and returns the ids it looked
+# at, so chunks advance even where nothing needed fixing.
+_RECONCILE_SQL = {
+    "categories": """
+        WITH chunk AS (
+            SELECT c.id, (
+                SELECT count(*) FROM posts p
+                WHERE p.category_id = c.id AND p.is_active AND p.deleted_at IS NULL
+            ) AS n
+            FROM categories c
+            WHERE c.id > :last_id
+            ORDER BY c.id
+            LIMIT :limit
+        ), fixed AS (
+            UPDATE categories SET post_count = chunk.n
+            FROM chunk
+            WHERE categories.id = chunk.id AND categories.post_count <> chunk.n
+            RETURNING categories.id
+        )
+        SELECT max(chunk.id), count(*), (SELECT count(*) FROM fixed) FROM chunk
+    """,
+    "tags": """
+        WITH chunk AS (
+            SELECT t.id, (
+                SELECT count(*) FROM post_tags pt
+                JOIN posts p ON p.id = pt.post_id
+                WHERE pt.tag_id = t.id AND p.is_active AND p.deleted_at IS NULL
+            ) AS n
+            FROM tags t
+            WHERE t.id > :last_id
+            ORDER BY t.id
+            LIMIT :limit
+        ), fixed AS (
+            UPDATE tags SET post_count = chunk.n
+            FROM chunk
+            WHERE tags.id = chunk.id AND tags.post_count <> chunk.n
+            RETURNING tags.id
+        )
+        SELECT max(chunk.id), count(*), (SELECT count(*) FROM fixed) FROM chunk
+    """,
+}
+
+
+def _reconcile_table(session, sql: str) -> int:
+    fixed = 0
+    last_id = 0
+    while True:
+        last, seen, changed = session.execute(
+            text(sql), {"last_id": last_id, "limit": RECONCILE_CHUNK_SIZE}
+        ).one()
+        session.commit()
+
+        fixed += changed
+        if seen < RECONCILE_CHUNK_SIZE:
+            return fixed
+        last_id = last
+
+
+def reconcile() -> dict:
+    with SessionLocal() as session:
+        result = {
+            table: _reconcile_table(session, sql)
+            for table, sql in _RECONCILE_SQL.items()
+        }
+
+    if any(result.values()):
+        logger.warning("post_count drift repaired: %s", result)
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(reconcile())
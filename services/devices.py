@@ -0,0 +1,132 @@
+"""Identify anonymous clients as ``Device`` rows for likes and reading history.
+
+A device is keyed by sha256(client token + user agent), where the token is a
+random value kept in the DEVICE_COOKIE_NAME cookie. Keys resolve through an
+in-process LRU, so Postgres is only asked on a miss; ``last_active`` is
+buffered and written in batches by flush(), a scheduled job.
+"""
+
+import hashlib
+import os
+import secrets
+import threading
+from typing import Annotated
+
+from fastapi import Cookie, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+
+from database import SessionLocal
+from models import Device
+from services.cache import TTLCache
+
+
+DEVICE_COOKIE_NAME = "device"
+DEVICE_COOKIE_MAX_AGE = int(os.getenv("DEVICE_COOKIE_MAX_AGE", str(365 * 24 * 3600)))
+DEVICE_CACHE_SIZE = int(os.getenv("DEVICE_CACHE_SIZE", "50000"))
+DEVICE_CACHE_TTL = float(os.getenv("DEVICE_CACHE_TTL", "3600"))
+DEVICE_FLUSH_INTERVAL = float(os.getenv("DEVICE_FLUSH_INTERVAL", "30"))
+DEVICE_MAX_PENDING = int(os.getenv("DEVICE_MAX_PENDING", "50000"))
+MAX_TOKEN_LENGTH = 64
+
+_TOUCH_SQL = text("""
+UPDATE devices SET last_active = now()
+WHERE id = ANY(CAST(:ids AS BIGINT[]))
+""")
+
+device_cache = TTLCache(maxsize=DEVICE_CACHE_SIZE, ttl=DEVICE_CACHE_TTL)
+
+_lock = threading.Lock()
+_active: set[int] = set()
+
+
+def device_key(user_agent: str, token: str) -> str:
+    return hashlib.sha256(f"{token}\0{user_agent}".encode()).hexdigest()
+
+
+def _get_or_create(key: str, user_agent: str) -> int:
+    # DO UPDATE (not DO NOTHING) so RETURNING yields the id of an existing row.
+    stmt = (
+        insert(Device)
+        .values(device_key=key, user_agent=user_agent, last_active=func.now())
+        .on_conflict_do_update(
+            index_elements=[Device.device_key], set_={"last_active": func.now()}
+        )
+        .returning(Device.id)
+    )
+    with SessionLocal() as session:
+        device_id = session.execute(stmt).scalar_one()
+        session.commit()
+    return device_id
+
+
+def touch(device_id: int):
+    with _lock:
+        if len(_active) < DEVICE_MAX_PENDING:
+            _active.add(device_id)
+
+
+async def resolve(user_agent: str, token: str) -> int:
+    key = device_key(user_agent, token)
+    device_id = device_cache.get(key)
+    if device_id is None:
+        device_id = await run_in_threadpool(_get_or_create, key, user_agent)
+        device_cache.set(key, device_id)
+    else:
+        touch(device_id)
+    return device_id
+
+
+def _user_agent(request: Request) -> str:
+    return request.headers.get("user-agent", "")[:255]
+
+
+def _valid(token: str | None) -> bool:
+    return bool(token) and len(token) <= MAX_TOKEN_LENGTH
+
+
+async def get_device(
+    request: Request,
+    response: Response,
+    token: Annotated[str | None, Cookie(alias=DEVICE_COOKIE_NAME)] = None,
+) -> int:
+    """Resolve the caller's device, issuing a token cookie on first use."""
+    if not _valid(token):
+        token = secrets.token_urlsafe(24)
+        response.set_cookie(
+            key=DEVICE_COOKIE_NAME,
+            value=token,
+            max_age=DEVICE_COOKIE_MAX_AGE,
+            httponly=True,
+            samesite="lax",
+        )
+    return await resolve(_user_agent(request), token)
+
+
+async def get_optional_device(
+    request: Request,
+    token: Annotated[str | None, Cookie(alias=DEVICE_COOKIE_NAME)] = None,
+) -> int | None:
+    """Like get_device(), but clients without a token stay anonymous."""
+    if not _valid(token):
+        return None
+    return await resolve(_user_agent(request), token)
+
+
+def flush():
+    global _active
+
+    with _lock:
+        active, _active = _active, set()
+
+    if not active:
+        return
+
+    with SessionLocal() as session:
+        session.execute(_TOUCH_SQL, {"ids": sorted(active)})
+        session.commit()
+
+
+device_dep = Annotated[int, Depends(get_device)]
+optional_device_dep = Annotated[int | None, Depends(get_optional_device)]
@@ -0,0 +1,129 @@
+"""Materialized feeds: the newest live post ids per category and per tag.
+
+A feed is built on its first read and holds at most FEED_MAX_ITEMS ids in
+(created_at, id) descending order, so a page inside that window is a slice
+plus a batch hydration from the post cache; deeper pages go to the database.
+
+Each worker keeps its own feeds. Writes in this worker are applied in place
+(fan-out on write), new posts from other workers arrive through the live
+feed's NOTIFY, and every feed is rebuilt after FEED_TTL to pick up edits
+made elsewhere.
+"""
+
+import bisect
+import os
+import threading
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Literal
+
+from sqlalchemy import select
+
+from models import Post, post_tag_m2m_table
+from services.cache import TTLCache
+
+
+FEED_MAX_ITEMS = int(os.getenv("FEED_MAX_ITEMS", "500"))
+FEED_MAX_FEEDS = int(os.getenv("FEED_MAX_FEEDS", "1000"))
+FEED_TTL = float(os.getenv("FEED_TTL", "300"))
+
+Kind = Literal["category", "tag"]
+
+
+class _Feed:
+    def __init__(self, rows: list[tuple[datetime, int]]):
+        # Negated sort keys keep the list ascending for bisect while the
+        # feed reads newest first.
+        self.keys = [
+            (-created_at.timestamp(), -post_id) for created_at, post_id in rows
+        ]
+        self.ids = {post_id for _, post_id in rows}
+        # Every matching post fits, so pages past the end are known empty.
+        self.complete = len(rows) < FEED_MAX_ITEMS
+
+    def add(self, post_id: int, created_at: datetime):
+        key = (-created_at.timestamp(), -post_id)
+        index = bisect.bisect_left(self.keys, key)
+        # Past the last known id of an incomplete feed is the database's part.
+        if post_id in self.ids or (index == len(self.keys) and not self.complete):
+            return
+        self.keys.insert(index, key)
+        self.ids.add(post_id)
+        if len(self.keys) > FEED_MAX_ITEMS:
+            self.ids.discard(-self.keys.pop()[1])
+            self.complete = False
+
+    def remove(self, post_id: int):
+        # An incomplete feed gets shorter; pages that reach past its end go to
+        # the database until the rebuild.
+        if post_id in self.ids:
+            self.ids.discard(post_id)
+            self.keys = [key for key in self.keys if key[1] != -post_id]
+
+    def slice(self, offset: int, limit: int) -> list[int] | None:
+        if offset + limit > len(self.keys) and not self.complete:
+            return None
+        return [-post_id for _, post_id in self.keys[offset : offset + limit]]
+
+
+_feeds = TTLCache(maxsize=FEED_MAX_FEEDS, ttl=FEED_TTL)
+_lock = threading.Lock()
+
+
+def build_statement(kind: Kind, key: int):
+    stmt = select(Post.created_at, Post.id)
+    if kind == "category":
+        stmt = stmt.where(Post.category_id == key)
+    else:
+        stmt = stmt.join(
+            post_tag_m2m_table, post_tag_m2m_table.c.post_id == Post.id
+        ).where(post_tag_m2m_table.c.tag_id == key)
+    return stmt.order_by(Post.created_at.desc(), Post.id.desc()).limit(FEED_MAX_ITEMS)
+
+
+def _build(session, kind: Kind, key: int) -> _Feed:
+    return _Feed(session.execute(build_statement(kind, key)).all())
+
+
+def page(session, kind: Kind, key: int, offset: int, limit: int) -> list[int] | None:
+    """Post ids for one page of a feed, or None if the page is past its end."""
+    if offset + limit > FEED_MAX_ITEMS:
+        return None
+
+    feed = _feeds.get((kind, key))
+    if feed is None:
+        feed = _build(session, kind, key)
+        _feeds.set((kind, key), feed)
+    with _lock:
+        return feed.slice(offset, limit)
+
+
+def add(
+    post_id: int, created_at: datetime, category_id: int | None, tag_ids: Iterable[int]
+):
+    """Fan a live post out to the feeds of its category and tags."""
+    keys = [("tag", tag_id) for tag_id in tag_ids]
+    if category_id is not None:
+        keys.append(("category", category_id))
+
+    with _lock:
+        for key in keys:
+            feed = _feeds.get(key)
+            if feed is not None:
+                feed.add(post_id, created_at)
+
+
+def remove(post_ids: Iterable[int]):
+    post_ids = list(post_ids)
+    with _lock:
+        for feed in _feeds.values():
+            for post_id in post_ids:
+                feed.remove(post_id)
+
+
+def active() -> bool:
+    return len(_feeds) > 0
+
+
+def clear():
+    _feeds.clear()
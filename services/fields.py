@@ -0,0 +1,34 @@
+"""Sparse fieldsets: map a ``fields=`` query value onto selected columns.
+
+Each endpoint allows the fields of its response schema and has a default
+set, so large columns such as ``Post.body`` are only read when asked for.
+"""
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+
+def allowed_columns(model, schema: type[BaseModel]) -> dict:
+    """Columns of ``model`` that ``schema`` can return, by field name."""
+    return {name: getattr(model, name) for name in schema.model_fields}
+
+
+def projection(fields: str | None, allowed: dict, default: tuple[str, ...]) -> list:
+    """Columns for a comma separated ``fields`` value, in the order given.
+
+    A value with no names in it, such as ``fields=,``, means the default set.
+    """
+    names = list(
+        dict.fromkeys(n.strip() for n in (fields or "").split(",") if n.strip())
+    )
+    if not names:
+        return [allowed[name] for name in default]
+
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}; allowed: "
+            f"{', '.join(allowed)}",
+        )
+    return [allowed[name] for name in names]
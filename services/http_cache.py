@@ -0,0 +1,80 @@
+import logging
+import os
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+import httpx
+from fastapi import Request
+
+
+logger = logging.getLogger(__name__)
+
+POST_MAX_AGE = int(os.getenv("POST_CACHE_MAX_AGE", "60"))
+POST_SHARED_MAX_AGE = int(os.getenv("POST_CACHE_SHARED_MAX_AGE", "600"))
+CDN_PURGE_URL = os.getenv("CDN_PURGE_URL")
+CDN_PURGE_TOKEN = os.getenv("CDN_PURGE_TOKEN")
+CDN_PURGE_BATCH = 256
+
+ALL_POSTS_KEY = "posts"
+
+
+def post_key(post_id: int) -> str:
+    return f"post-{post_id}"
+
+
+def post_etag(post_id: int, updated_at: datetime) -> str:
+    return f'"{post_id}-{int(updated_at.timestamp() * 1_000_000)}"'
+
+
+def post_headers(post_id: int, updated_at: datetime) -> dict[str, str]:
+    return {
+        "ETag": post_etag(post_id, updated_at),
+        "Last-Modified": format_datetime(
+            updated_at.astimezone(timezone.utc), usegmt=True
+        ),
+        "Cache-Control": f"public, max-age={POST_MAX_AGE}, s-maxage={POST_SHARED_MAX_AGE}",
+        "Surrogate-Key": f"{post_key(post_id)} {ALL_POSTS_KEY}",
+    }
+
+
+def is_not_modified(request: Request, etag: str, updated_at: datetime) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since (RFC 9110)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return updated_at.replace(microsecond=0) <= since
+
+
+async def purge(keys: Iterable[str]):
+    """Purge surrogate keys at the CDN; a no-op unless CDN_PURGE_URL is set."""
+    keys = list(keys)
+    if not CDN_PURGE_URL or not keys:
+        return
+
+    headers = {"Fastly-Key": CDN_PURGE_TOKEN} if CDN_PURGE_TOKEN else {}
+    async with httpx.AsyncClient(timeout=10) as client:
+        for i in range(0, len(keys), CDN_PURGE_BATCH):
+            batch = keys[i : i + CDN_PURGE_BATCH]
+            try:
+                response = await client.post(
+                    CDN_PURGE_URL, headers={**headers, "Surrogate-Key": " ".join(batch)}
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as exc:
+                logger.warning("CDN purge of %d keys failed: %s", len(batch), exc)
+
+
+async def purge_posts(post_ids: Iterable[int]):
+    await purge(post_key(post_id) for post_id in post_ids)
@@ -0,0 +1,184 @@
+"""Live feed of new posts, fed by Postgres LISTEN/NOTIFY.
+
+Each worker holds one dedicated listening connection. Notified post ids are
+loaded in one query per batch, serialized once, and fanned out to the
+subscribers' bounded queues and to the worker's materialized feeds. A
+subscriber whose queue fills up is dropped and has to reconnect.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+
+import psycopg2
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from database import SessionLocal, engine
+from models import Post, post_tag_m2m_table
+from services import feeds
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "new_posts"
+LIVE_FEED_QUEUE_SIZE = int(os.getenv("LIVE_FEED_QUEUE_SIZE", "100"))
+LIVE_FEED_MAX_SUBSCRIBERS = int(os.getenv("LIVE_FEED_MAX_SUBSCRIBERS", "5000"))
+LIVE_FEED_RECONNECT_DELAY = float(os.getenv("LIVE_FEED_RECONNECT_DELAY", "5"))
+
+
+@dataclass(eq=False)
+class Subscriber:
+    category_id: int | None = None
+    tag_id: int | None = None
+    queue: asyncio.Queue = field(
+        default_factory=lambda: asyncio.Queue(maxsize=LIVE_FEED_QUEUE_SIZE)
+    )
+
+    def wants(self, post: dict) -> bool:
+        if self.category_id is not None and post["category_id"] != self.category_id:
+            return False
+        return self.tag_id is None or self.tag_id in post["tag_ids"]
+
+
+_subscribers: set[Subscriber] = set()
+
+
+def subscribe(category_id: int | None = None, tag_id: int | None = None):
+    if len(_subscribers) >= LIVE_FEED_MAX_SUBSCRIBERS:
+        return None
+    subscriber = Subscriber(category_id=category_id, tag_id=tag_id)
+    _subscribers.add(subscriber)
+    return subscriber
+
+
+def unsubscribe(subscriber: Subscriber):
+    _subscribers.discard(subscriber)
+
+
+def _drop(subscriber: Subscriber):
+    """End a subscriber's stream; ``None`` tells the reader it was closed."""
+    _subscribers.discard(subscriber)
+    queue = subscriber.queue
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait(None)
+
+
+def publish(post: dict):
+    for subscriber in list(_subscribers):
+        if not subscriber.wants(post):
+            continue
+        try:
+            subscriber.queue.put_nowait(post)
+        except asyncio.QueueFull:
+            logger.info("dropping slow live feed subscriber")
+            _drop(subscriber)
+
+
+def close_all():
+    for subscriber in list(_subscribers):
+        _drop(subscriber)
+
+
+def load_posts(post_ids: list[int]) -> list[dict]:
+    posts_stmt = (
+        select(Post.id, Post.title, Post.slug, Post.category_id, Post.created_at)
+        .where(Post.id.in_(post_ids), Post.is_active.is_(True))
+        .order_by(Post.id)
+    )
+    tags_stmt = select(post_tag_m2m_table.c.post_id, post_tag_m2m_table.c.tag_id).where(
+        post_tag_m2m_table.c.post_id.in_(post_ids)
+    )
+    with SessionLocal() as session:
+        posts = [row._asdict() for row in session.execute(posts_stmt)]
+        tags = session.execute(tags_stmt).all()
+
+    tag_ids = {}
+    for post_id, tag_id in tags:
+        tag_ids.setdefault(post_id, []).append(tag_id)
+    for post in posts:
+        post["tag_ids"] = tag_ids.get(post["id"], [])
+        post["json"] = json.dumps(
+            {**post, "created_at": post["created_at"].isoformat()}, ensure_ascii=False
+        )
+    return posts
+
+
+def _connect():
+    params = engine.url.translate_connect_args(username="user", database="dbname")
+    conn = psycopg2.connect(**params)
+    conn.set_session(autocommit=True)
+    with conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {CHANNEL}")
+    return conn
+
+
+async def _dispatch(incoming: asyncio.Queue):
+    while True:
+        post_ids = await incoming.get()
+        while not incoming.empty():
+            post_ids.extend(incoming.get_nowait())
+        if not _subscribers and not feeds.active():
+            continue
+        try:
+            posts = await run_in_threadpool(load_posts, sorted(set(post_ids)))
+        except Exception:
+            logger.exception("live feed could not load posts %s", post_ids)
+            continue
+        for post in posts:
+            # Posts created by other workers reach this worker's feeds here.
+            feeds.add(
+                post["id"], post["created_at"], post["category_id"], post["tag_ids"]
+            )
+            publish(post)
+
+
+async def _listen(conn, incoming: asyncio.Queue):
+    loop = asyncio.get_running_loop()
+    lost = loop.create_future()
+
+    def on_readable():
+        try:
+            conn.poll()
+        except psycopg2.Error as exc:
+            if not lost.done():
+                lost.set_exception(exc)
+            return
+        post_ids = [int(notify.payload) for notify in conn.notifies]
+        conn.notifies.clear()
+        if post_ids:
+            incoming.put_nowait(post_ids)
+
+    loop.add_reader(conn.fileno(), on_readable)
+    try:
+        await lost
+    finally:
+        loop.remove_reader(conn.fileno())
+
+
+async def run_listener():
+    """Keep one LISTEN connection open for this worker, reconnecting on loss."""
+    incoming = asyncio.Queue()
+    dispatcher = asyncio.create_task(_dispatch(incoming))
+    try:
+        while True:
+            try:
+                conn = await run_in_threadpool(_connect)
+            except Exception as exc:
+                logger.warning("live feed listener could not connect: %s", exc)
+                await asyncio.sleep(LIVE_FEED_RECONNECT_DELAY)
+                continue
+
+            try:
+                await _listen(conn, incoming)
+            except psycopg2.Error as exc:
+                logger.warning("live feed listener lost its connection: %s", exc)
+            finally:
+                conn.close()
+            await asyncio.sleep(LIVE_FEED_RECONNECT_DELAY)
+    finally:
+        dispatcher.cancel()
+        close_all()
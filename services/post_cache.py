@@ -0,0 +1,86 @@
+"""Per-worker cache of post payloads for multi-gets, by id and by slug.
+
+Lookups serve what is cached and fetch all misses in one ``= ANY(:ids)``
+query. Each worker keeps its own copy; writes invalidate the local entries
+and other workers converge within POST_CACHE_TTL.
+"""
+
+import os
+from collections.abc import Iterable
+
+from sqlalchemy import BigInteger, String, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from models import Post
+from schemas import PostDetailResponse
+from services.cache import TTLCache
+
+
+POST_CACHE_SIZE = int(os.getenv("POST_CACHE_SIZE", "10000"))
+POST_CACHE_TTL = float(os.getenv("POST_CACHE_TTL", "60"))
+
+posts = TTLCache(maxsize=POST_CACHE_SIZE, ttl=POST_CACHE_TTL)
+slug_ids = TTLCache(maxsize=POST_CACHE_SIZE, ttl=POST_CACHE_TTL)
+
+_COLUMNS = [getattr(Post, name) for name in PostDetailResponse.model_fields]
+# One array parameter, so the statement text is the same for every batch.
+BY_IDS = select(*_COLUMNS).where(
+    Post.id == any_(bindparam("ids", type_=ARRAY(BigInteger)))
+)
+BY_SLUGS = select(*_COLUMNS).where(
+    Post.slug == any_(bindparam("slugs", type_=ARRAY(String)))
+)
+
+
+def _load(session, stmt, params: dict) -> list[PostDetailResponse]:
+    found = [
+        PostDetailResponse.model_validate(row._asdict())
+        for row in session.execute(stmt, params)
+    ]
+    for post in found:
+        posts.set(post.id, post)
+        slug_ids.set(post.slug, post.id)
+    return found
+
+
+def get_many(session, ids: Iterable[int]) -> dict[int, PostDetailResponse]:
+    """Live posts among ``ids``, by id; absent ones are missing or hidden."""
+    found, misses = {}, []
+    for post_id in ids:
+        post = posts.get(post_id)
+        if post is None:
+            misses.append(post_id)
+        else:
+            found[post_id] = post
+
+    if misses:
+        for post in _load(session, BY_IDS, {"ids": misses}):
+            found[post.id] = post
+    return found
+
+
+def get_many_by_slug(session, slugs: Iterable[str]) -> dict[str, PostDetailResponse]:
+    found, misses = {}, []
+    for slug in slugs:
+        post_id = slug_ids.get(slug)
+        post = posts.get(post_id) if post_id is not None else None
+        # A renamed post leaves its old slug behind until it expires.
+        if post is None or post.slug != slug:
+            misses.append(slug)
+        else:
+            found[slug] = post
+
+    if misses:
+        for post in _load(session, BY_SLUGS, {"slugs": misses}):
+            found[post.slug] = post
+    return found
+
+
+def invalidate(post_ids: Iterable[int]):
+    for post_id in post_ids:
+        posts.pop(post_id)
+
+
+def clear():
+    posts.clear()
+    slug_ids.clear()
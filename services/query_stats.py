@@ -0,0 +1,154 @@
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from database import engine
+
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+MAX_FINGERPRINTS = int(os.getenv("QUERY_STATS_MAX_FINGERPRINTS", "500"))
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_RE = re.compile(r"(VALUES\s*)\(\?[^)]*\)(?:\s*,\s*\(\?[^)]*\))*", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    sql = _STRING_RE.sub("?", statement)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?...)", sql)
+    sql = _VALUES_RE.sub(r"\1(?...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+@dataclass
+class RequestStats:
+    count: int = 0
+    total_ms: float = 0.0
+    slow: list[tuple[str, float]] = field(default_factory=list)
+
+
+@dataclass
+class _EndpointTotals:
+    requests: int = 0
+    queries: int = 0
+    max_queries: int = 0
+    db_ms: float = 0.0
+
+
+@dataclass
+class _FingerprintTotals:
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("query_stats", default=None)
+_lock = threading.Lock()
+_endpoints: dict[str, _EndpointTotals] = {}
+_slow_queries: dict[str, _FingerprintTotals] = {}
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_started_at"].pop()) * 1000
+
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+
+    key = fingerprint(statement)
+    if stats is not None:
+        stats.slow.append((key, elapsed_ms))
+
+    with _lock:
+        totals = _slow_queries.get(key)
+        if totals is None:
+            if len(_slow_queries) >= MAX_FINGERPRINTS:
+                return
+            totals = _slow_queries[key] = _FingerprintTotals()
+        totals.calls += 1
+        totals.total_ms += elapsed_ms
+        totals.max_ms = max(totals.max_ms, elapsed_ms)
+
+
+@event.listens_for(engine, "handle_error")
+def _handle_error(context):
+    if context.connection is not None and context.connection.info.get(
+        "query_started_at"
+    ):
+        context.connection.info["query_started_at"].pop()
+
+
+def begin():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end(token, endpoint: str, stats: RequestStats):
+    _current.reset(token)
+
+    with _lock:
+        totals = _endpoints.setdefault(endpoint, _EndpointTotals())
+        totals.requests += 1
+        totals.queries += stats.count
+        totals.max_queries = max(totals.max_queries, stats.count)
+        totals.db_ms += stats.total_ms
+
+
+def report(limit: int = 50) -> dict:
+    with _lock:
+        endpoints = [
+            {
+                "endpoint": name,
+                "requests": t.requests,
+                "queries": t.queries,
+                "avg_queries": round(t.queries / t.requests, 2),
+                "max_queries": t.max_queries,
+                "db_ms": round(t.db_ms, 2),
+                "avg_db_ms": round(t.db_ms / t.requests, 2),
+            }
+            for name, t in _endpoints.items()
+        ]
+        slow = [
+            {
+                "fingerprint": key,
+                "calls": t.calls,
+                "total_ms": round(t.total_ms, 2),
+                "avg_ms": round(t.total_ms / t.calls, 2),
+                "max_ms": round(t.max_ms, 2),
+            }
+            for key, t in _slow_queries.items()
+        ]
+
+    endpoints.sort(key=lambda e: e["db_ms"], reverse=True)
+    slow.sort(key=lambda s: s["total_ms"], reverse=True)
+    return {
+        "slow_query_ms": SLOW_QUERY_MS,
+        "endpoints": endpoints[:limit],
+        "slow_queries": slow[:limit],
+    }
+
+
+def reset():
+    with _lock:
+        _endpoints.clear()
+        _slow_queries.clear()
@@ -0,0 +1,148 @@
+import logging
+import os
+import threading
+from collections import Counter
+
+from sqlalchemy import select, text
+
+from database import SessionLocal
+from models import ReadingHistory
+
+
+logger = logging.getLogger(__name__)
+
+HISTORY_SIZE = int(os.getenv("READING_HISTORY_SIZE", "50"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("READING_HISTORY_FLUSH_INTERVAL", "5"))
+HISTORY_MAX_PENDING = int(os.getenv("READING_HISTORY_MAX_PENDING", "50000"))
+
+OWNER_COLUMNS = {"device": ("device_id", "devices"), "user": ("user_id", "users")}
+
+# The newest reads go first; older entries that were re-read are dropped and
+# the array is cut to HISTORY_SIZE, so each row stays a small bounded array.
+_UPSERT_SQL = """
+INSERT INTO reading_histories ({column}, post_ids, updated_at)
+SELECT o.id, CAST(:post_ids AS BIGINT[]), now() FROM {table} o WHERE o.id = :owner_id
+ON CONFLICT ({column}) DO UPDATE SET
+    post_ids = (
+        excluded.post_ids || ARRAY(
+            SELECT h.id
+            FROM unnest(reading_histories.post_ids) WITH ORDINALITY AS h(id, n)
+            WHERE h.id <> ALL(excluded.post_ids)
+            ORDER BY h.n
+        )
+    )[1:{size}],
+    updated_at = now()
+"""
+
+_VIEWS_SQL = text("""
+UPDATE posts SET views_count = posts.views_count + v.n
+FROM unnest(CAST(:post_ids AS BIGINT[]), CAST(:counts AS BIGINT[])) AS v(id, n)
+WHERE posts.id = v.id
+""")
+
+_READER_COUNTS_SQL = text("""
+UPDATE users SET post_read_count = users.post_read_count + v.n
+FROM unnest(CAST(:user_ids AS BIGINT[]), CAST(:counts AS BIGINT[])) AS v(id, n)
+WHERE users.id = v.id
+""")
+
+_lock = threading.Lock()
+_pending: dict[tuple[str, int], list[int]] = {}
+_views: Counter[int] = Counter()
+
+
+def merge(newest: list[int], older: list[int]) -> list[int]:
+    merged = list(dict.fromkeys(newest))
+    seen = set(merged)
+    merged.extend(post_id for post_id in older if post_id not in seen)
+    return merged[:HISTORY_SIZE]
+
+
+def record(owner: tuple[str, int] | None, post_id: int):
+    """Buffer a read; it reaches Postgres on the next flush, off the read path."""
+    with _lock:
+        _views[post_id] += 1
+        if owner is None:
+            return
+        reads = _pending.get(owner)
+        if reads is None:
+            if len(_pending) >= HISTORY_MAX_PENDING:
+                return
+            reads = _pending[owner] = []
+        reads.append(post_id)
+
+
+def pending_for(owner: tuple[str, int]) -> list[int]:
+    with _lock:
+        return _pending.get(owner, [])[::-1]
+
+
+def load(session, owner: tuple[str, int]) -> list[int]:
+    """Most recent first, including reads that are not flushed yet."""
+    column, _ = OWNER_COLUMNS[owner[0]]
+    stmt = select(ReadingHistory.post_ids).where(
+        getattr(ReadingHistory, column) == owner[1]
+    )
+    stored = session.execute(stmt).scalar()
+    return merge(pending_for(owner), stored or [])
+
+
+def _requeue(pending: dict[tuple[str, int], list[int]], views: Counter[int]):
+    """Put back the buffers of a failed flush, ahead of the reads since."""
+    with _lock:
+        _views.update(views)
+        for owner, reads in pending.items():
+            newer = _pending.get(owner)
+            if newer is not None:
+                _pending[owner] = reads + newer
+            elif len(_pending) < HISTORY_MAX_PENDING:
+                _pending[owner] = reads
+
+
+def flush():
+    global _pending, _views
+
+    with _lock:
+        pending, _pending = _pending, {}
+        views, _views = _views, Counter()
+
+    if not pending and not views:
+        return
+
+    try:
+        _write(pending, views)
+    except Exception:
+        _requeue(pending, views)
+        raise
+
+
+def _write(pending: dict[tuple[str, int], list[int]], views: Counter[int]):
+    with SessionLocal() as session:
+        for kind, (column, table) in OWNER_COLUMNS.items():
+            rows = [
+                {"owner_id": owner_id, "post_ids": merge(reads[::-1], [])}
+                for (owner_kind, owner_id), reads in pending.items()
+                if owner_kind == kind
+            ]
+            if rows:
+                sql = _UPSERT_SQL.format(column=column, table=table, size=HISTORY_SIZE)
+                session.execute(text(sql), rows)
+
+        if views:
+            session.execute(
+                _VIEWS_SQL,
+                {"post_ids": list(views), "counts": list(views.values())},
+            )
+
+        readers = {
+            owner_id: len(reads)
+            for (kind, owner_id), reads in pending.items()
+            if kind == "user"
+        }
+        if readers:
+            session.execute(
+                _READER_COUNTS_SQL,
+                {"user_ids": list(readers), "counts": list(readers.values())},
+            )
+
+        session.commit()
@@ -0,0 +1,273 @@
+"""Related-posts index built from tag and co-like overlap.
+
+Every live post is a sparse row vector with two L2-normalised, weighted
+blocks (tags, devices that liked it). Cosine similarity between rows gives
+the related score; the top RELATED_TOP_K per post are stored in
+``related_posts`` so serving is a single primary-key range scan.
+
+Category is not a block: it would link every pair of posts in a category
+and make the similarity product dense. Among equal scores, posts in the
+same category rank first.
+
+    python -m services.related   # full rebuild
+"""
+
+import logging
+import os
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select, union
+
+from database import SessionLocal
+from models import Like, Post, RelatedPost, post_tag_m2m_table
+
+
+logger = logging.getLogger(__name__)
+
+RELATED_TOP_K = int(os.getenv("RELATED_TOP_K", "5"))
+RELATED_CHUNK_SIZE = int(os.getenv("RELATED_CHUNK_SIZE", "1000"))
+RELATED_CANDIDATE_LIMIT = int(os.getenv("RELATED_CANDIDATE_LIMIT", "2000"))
+CO_LIKE_WINDOW_DAYS = int(os.getenv("RELATED_CO_LIKE_WINDOW_DAYS", "90"))
+# Co-likes age out of the window, so the whole index is rebuilt periodically.
+RELATED_REBUILD_INTERVAL = float(os.getenv("RELATED_REBUILD_INTERVAL", "86400"))
+
+TAG_WEIGHT = 1.0
+CO_LIKE_WEIGHT = 0.3
+
+
+def _normalize(matrix: sparse.csr_matrix, weight: float = 1.0) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(weight / norms) @ matrix
+
+
+def _block(index: dict[int, int], pairs, weight: float) -> sparse.csr_matrix:
+    pairs = [
+        (index[post_id], feature) for post_id, feature in pairs if post_id in index
+    ]
+    if not pairs:
+        return sparse.csr_matrix((len(index), 0))
+
+    rows, features = np.array(pairs, dtype=np.int64).T
+    _, columns = np.unique(features, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)), shape=(len(index), columns.max() + 1)
+    )
+    matrix.data[:] = 1.0
+    return _normalize(matrix, weight)
+
+
+def feature_statements(post_ids: Iterable[int] | None = None):
+    """The posts, tags and co-likes queries, for all posts or ``post_ids``."""
+    posts = select(Post.id, Post.category_id).where(Post.is_active.is_(True))
+    tags = select(post_tag_m2m_table.c.post_id, post_tag_m2m_table.c.tag_id)
+    since = datetime.now(timezone.utc) - timedelta(days=CO_LIKE_WINDOW_DAYS)
+    likes = select(Like.post_id, Like.device_id).where(Like.created_at >= since)
+
+    if post_ids is not None:
+        post_ids = list(post_ids)
+        posts = posts.where(Post.id.in_(post_ids))
+        tags = tags.where(post_tag_m2m_table.c.post_id.in_(post_ids))
+        likes = likes.where(Like.post_id.in_(post_ids))
+    return posts.order_by(Post.id), tags, likes
+
+
+def load_features(
+    session, post_ids: Iterable[int] | None = None
+) -> tuple[np.ndarray, np.ndarray, sparse.csr_matrix]:
+    """Return live post ids, their categories (0 for none) and feature matrix.
+
+    Row ``i`` of each is for ``ids[i]``.
+    """
+    posts, tags, likes = feature_statements(post_ids)
+
+    rows = session.execute(posts).all()
+    ids = np.array([row.id for row in rows], dtype=np.int64)
+    categories = np.array([row.category_id or 0 for row in rows], dtype=np.int64)
+    index = {int(post_id): i for i, post_id in enumerate(ids)}
+
+    matrix = sparse.hstack(
+        [
+            _block(index, session.execute(tags).all(), TAG_WEIGHT),
+            _block(index, session.execute(likes).all(), CO_LIKE_WEIGHT),
+        ],
+        format="csr",
+    )
+    return ids, categories, _normalize(matrix)
+
+
+def _top(
+    ids: np.ndarray,
+    categories: np.ndarray,
+    columns: np.ndarray,
+    scores: np.ndarray,
+    row: int,
+):
+    keep = (ids[columns] != ids[row]) & (scores > 0)
+    columns, scores = columns[keep], scores[keep]
+    same = (categories[columns] == categories[row]) & (categories[row] != 0)
+    # Highest score first, then the same category, then newer posts.
+    order = np.lexsort((-ids[columns], ~same, -scores))[:RELATED_TOP_K]
+    return [(int(ids[columns[i]]), float(scores[i])) for i in order]
+
+
+def top_related(
+    ids: np.ndarray,
+    categories: np.ndarray,
+    matrix: sparse.csr_matrix,
+    rows: Iterable[int],
+) -> dict[int, list[tuple[int, float]]]:
+    rows = list(rows)
+    result = {}
+    transposed = matrix.T.tocsc()
+
+    for start in range(0, len(rows), RELATED_CHUNK_SIZE):
+        chunk = rows[start : start + RELATED_CHUNK_SIZE]
+        similarities = (matrix[chunk] @ transposed).tocsr()
+        for i, row in enumerate(chunk):
+            begin, end = similarities.indptr[i], similarities.indptr[i + 1]
+            result[int(ids[row])] = _top(
+                ids,
+                categories,
+                similarities.indices[begin:end],
+                similarities.data[begin:end],
+                row,
+            )
+
+    return result
+
+
+def _write(session, related: dict[int, list[tuple[int, float]]]):
+    post_ids = list(related)
+    for start in range(0, len(post_ids), RELATED_CHUNK_SIZE):
+        chunk = post_ids[start : start + RELATED_CHUNK_SIZE]
+        session.execute(delete(RelatedPost).where(RelatedPost.post_id.in_(chunk)))
+
+        rows = [
+            {
+                "post_id": post_id,
+                "rank": rank,
+                "related_post_id": related_id,
+                "score": score,
+            }
+            for post_id in chunk
+            for rank, (related_id, score) in enumerate(related[post_id])
+        ]
+        if rows:
+            session.execute(insert(RelatedPost), rows)
+
+
+def rebuild_all():
+    with SessionLocal() as session:
+        ids, categories, matrix = load_features(session)
+        related = top_related(ids, categories, matrix, range(len(ids)))
+
+        session.execute(delete(RelatedPost))
+        _write(session, related)
+        session.commit()
+
+    logger.info("related posts rebuilt for %d posts", len(related))
+
+
+def _neighbours(session, post_ids: list[int]) -> set[int]:
+    """Posts whose lists may change when ``post_ids`` change.
+
+    Only shared tags give a score here; a shared category merely breaks ties,
+    so it adds no candidates.
+    """
+    tag_ids = select(post_tag_m2m_table.c.tag_id).where(
+        post_tag_m2m_table.c.post_id.in_(post_ids)
+    )
+
+    candidates = union(
+        select(post_tag_m2m_table.c.post_id)
+        .where(post_tag_m2m_table.c.tag_id.in_(tag_ids))
+        .limit(RELATED_CANDIDATE_LIMIT),
+        select(RelatedPost.post_id).where(RelatedPost.related_post_id.in_(post_ids)),
+    )
+    return set(session.scalars(candidates)) - set(post_ids)
+
+
+def rebuild_for_posts(post_ids: Iterable[int]):
+    """Incrementally refresh lists after ``post_ids`` changed tags or category.
+
+    The changed posts are recomputed against their candidates; each
+    neighbour's stored list is re-ranked with fresh scores for the changed
+    posts and written back only if its order changed. Anything further away
+    is left to the periodic full rebuild.
+    """
+    post_ids = list(set(post_ids))
+    if not post_ids:
+        return
+
+    with SessionLocal() as session:
+        neighbours = _neighbours(session, post_ids)
+        ids, categories, matrix = load_features(session, [*neighbours, *post_ids])
+        index = {int(post_id): i for i, post_id in enumerate(ids)}
+
+        changed_rows = [index[p] for p in post_ids if p in index]
+        related = top_related(ids, categories, matrix, changed_rows)
+        for post_id in post_ids:
+            related.setdefault(post_id, [])
+
+        neighbour_rows = [index[n] for n in neighbours if n in index]
+        if neighbour_rows:
+            changed = set(post_ids)
+            stored, previous = {}, {}
+            stmt = (
+                select(
+                    RelatedPost.post_id, RelatedPost.related_post_id, RelatedPost.score
+                )
+                .where(RelatedPost.post_id.in_(list(neighbours)))
+                .order_by(RelatedPost.post_id, RelatedPost.rank)
+            )
+            for post_id, related_id, score in session.execute(stmt):
+                previous.setdefault(post_id, []).append(related_id)
+                if related_id not in changed:
+                    stored.setdefault(post_id, {})[related_id] = score
+
+            # Stored entries outside the loaded posts still need their
+            # category for the tie-break.
+            category_of = {int(post_id): categories[i] for post_id, i in index.items()}
+            unknown = {r for entries in stored.values() for r in entries}
+            unknown -= category_of.keys()
+            if unknown:
+                category_of.update(
+                    session.execute(
+                        select(Post.id, Post.category_id).where(
+                            Post.id.in_(list(unknown))
+                        )
+                    ).all()
+                )
+
+            scores = (matrix[neighbour_rows] @ matrix[changed_rows].T).toarray()
+            changed_ids = ids[changed_rows]
+            for i, row in enumerate(neighbour_rows):
+                post_id = int(ids[row])
+                merged = stored.get(post_id, {})
+                for j in np.flatnonzero(scores[i]):
+                    merged[int(changed_ids[j])] = float(scores[i, j])
+                category = categories[row]
+                same = {
+                    related_id
+                    for related_id in merged
+                    if category and category_of.get(related_id) == category
+                }
+                ranked = sorted(
+                    merged.items(),
+                    key=lambda item: (-item[1], item[0] not in same, -item[0]),
+                )[:RELATED_TOP_K]
+                order = [related_id for related_id, _ in ranked]
+                if order != previous.get(post_id, []):
+                    related[post_id] = ranked
+
+        _write(session, related)
+        session.commit()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    rebuild_all()
@@ -0,0 +1,66 @@
+import os
+from collections.abc import Callable, Hashable
+from functools import cache
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+
+from services.cache import TTLCache
+from services.compression import Precompressed
+
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+# Each worker keeps its own copy; writes invalidate the local entry and
+# other workers converge within RESPONSE_CACHE_TTL.
+responses = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+
+@cache
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def render(response_type: Any, value: Any) -> bytes:
+    """Serialize ``value`` the way FastAPI would for ``response_model``."""
+    adapter = _adapter(response_type)
+    return adapter.dump_json(
+        adapter.validate_python(value, from_attributes=True), by_alias=True
+    )
+
+
+async def get_or_build(
+    session,
+    key: Hashable,
+    response_type: Any,
+    load: Callable[[Any], Any],
+    ttl: float | None = None,
+) -> Precompressed:
+    """Return the cached encoded response, building it with ``load(session)``."""
+    entry = responses.get(key)
+    if entry is None:
+        entry = await run_in_threadpool(
+            lambda: _store(key, response_type, load(session), ttl)
+        )
+    return entry
+
+
+def _store(key: Hashable, response_type: Any, value: Any, ttl: float | None):
+    entry = Precompressed.encode(render(response_type, value))
+    responses.set(key, entry, ttl=ttl)
+    return entry
+
+
+async def store(
+    key: Hashable, response_type: Any, value: Any, ttl: float | None = None
+) -> Precompressed:
+    # Precompression runs brotli and gzip at their highest levels, which
+    # would stall every other request if it ran on the event loop.
+    return await run_in_threadpool(_store, key, response_type, value, ttl)
+
+
+def invalidate(*keys: Hashable):
+    for key in keys:
+        responses.pop(key)
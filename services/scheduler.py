@@ -0,0 +1,195 @@
+"""Periodic jobs for every app worker, with one leader per cluster-wide job.
+
+Jobs registered with ``leader=True`` run on one worker only: each worker
+tries ``pg_try_advisory_lock`` for the job on a dedicated connection before
+every tick, and the worker that gets it keeps it until its connection
+closes. Jobs that flush in-process buffers use ``leader=False`` and run in
+every worker.
+
+Ticks are fixed-rate with +/- ``jitter`` so workers do not fire in lockstep;
+a tick that finds the previous run still going is skipped, not queued.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+import psycopg2
+from fastapi.concurrency import run_in_threadpool
+
+from database import engine
+
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "0.1"))
+
+
+def lock_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key for a job name."""
+    digest = hashlib.blake2b(f"scheduler:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class _LeaderLocks:
+    """Session-level advisory locks held on one connection outside the pool."""
+
+    def __init__(self):
+        self._conn = None
+        self._held: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        params = engine.url.translate_connect_args(username="user", database="dbname")
+        conn = psycopg2.connect(**params)
+        conn.set_session(autocommit=True)
+        return conn
+
+    def acquire(self, name: str) -> bool:
+        with self._lock:
+            try:
+                if self._conn is None or self._conn.closed:
+                    self._held.clear()
+                    self._conn = self._connect()
+                with self._conn.cursor() as cursor:
+                    if name in self._held:
+                        # Still leader as long as the connection is alive.
+                        cursor.execute("SELECT 1")
+                        return True
+                    cursor.execute("SELECT pg_try_advisory_lock(%s)", (lock_key(name),))
+                    acquired = cursor.fetchone()[0]
+            except psycopg2.Error as exc:
+                logger.warning("scheduler leader connection failed: %s", exc)
+                self.close()
+                return False
+
+            if acquired:
+                self._held.add(name)
+                logger.info("scheduler: this worker now leads %s", name)
+            return acquired
+
+    def close(self):
+        # Closing the connection releases every lock it holds.
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+        self._conn = None
+        self._held.clear()
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Any]
+    interval: float
+    leader: bool = True
+    jitter: float = SCHEDULER_JITTER
+
+    is_leader: bool = False
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_started_at: datetime | None = None
+    last_duration: float | None = None
+    max_duration: float = 0.0
+    total_duration: float = 0.0
+    last_error: str | None = None
+
+    def next_delay(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "leader_only": self.leader,
+            "is_leader": self.is_leader if self.leader else None,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped_overlapping": self.skipped,
+            "last_started_at": self.last_started_at,
+            "last_duration_ms": (
+                round(self.last_duration * 1000, 2)
+                if self.last_duration is not None
+                else None
+            ),
+            "avg_duration_ms": (
+                round(self.total_duration / self.runs * 1000, 2) if self.runs else None
+            ),
+            "max_duration_ms": round(self.max_duration * 1000, 2),
+            "last_error": self.last_error,
+        }
+
+
+jobs: dict[str, Job] = {}
+_leader = _LeaderLocks()
+_runs: set[asyncio.Task] = set()
+
+
+def register(name: str, func: Callable[[], Any], interval: float, leader=True) -> Job:
+    """Add a job; ``func`` is synchronous and runs in the threadpool."""
+    job = jobs[name] = Job(name=name, func=func, interval=interval, leader=leader)
+    return job
+
+
+async def _execute(job: Job):
+    job.running = True
+    job.last_started_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(job.func)
+        job.last_error = None
+    except Exception as exc:
+        job.failures += 1
+        job.last_error = repr(exc)
+        logger.exception("scheduled job %s failed", job.name)
+    finally:
+        elapsed = time.perf_counter() - started
+        job.running = False
+        job.runs += 1
+        job.last_duration = elapsed
+        job.total_duration += elapsed
+        job.max_duration = max(job.max_duration, elapsed)
+
+
+async def _tick(job: Job):
+    # The first run is spread over the jitter window as well.
+    await asyncio.sleep(random.uniform(0, job.interval * job.jitter))
+    while True:
+        if job.running:
+            job.skipped += 1
+        else:
+            if job.leader:
+                job.is_leader = await run_in_threadpool(_leader.acquire, job.name)
+            if job.is_leader or not job.leader:
+                task = asyncio.create_task(_execute(job))
+                _runs.add(task)
+                task.add_done_callback(_runs.discard)
+        await asyncio.sleep(job.next_delay())
+
+
+def start() -> list[asyncio.Task]:
+    return [asyncio.create_task(_tick(job)) for job in jobs.values()]
+
+
+async def stop():
+    for task in list(_runs):
+        task.cancel()
+    await asyncio.gather(*_runs, return_exceptions=True)
+    await run_in_threadpool(_leader.close)
+
+
+def report() -> dict:
+    return {"pid": os.getpid(), "jobs": [job.status() for job in jobs.values()]}
@@ -0,0 +1,88 @@
+import re
+from collections.abc import Iterable
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from utils import generate_slug
+
+
+SLUG_MAX_LENGTH = 100
+SUFFIX_MAX_LENGTH = 8
+LOOKUP_CHUNK_SIZE = 500
+
+_SUFFIX_RE = re.compile(r"(.+)-(\d+)")
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def base_slug(model, text: str) -> str:
+    slug = generate_slug(text)[: SLUG_MAX_LENGTH - SUFFIX_MAX_LENGTH].strip("-")
+    return slug or model.__name__.lower()
+
+
+def _taken_suffixes(
+    session: Session, model, bases: set[str], exclude_id: int | None = None
+) -> dict[str, set[int]]:
+    """Map each base slug to the numeric suffixes already used for it (0 = bare)."""
+    taken: dict[str, set[int]] = {base: set() for base in bases}
+    ordered = sorted(bases)
+
+    for i in range(0, len(ordered), LOOKUP_CHUNK_SIZE):
+        chunk = ordered[i : i + LOOKUP_CHUNK_SIZE]
+        conditions = []
+        for base in chunk:
+            conditions.append(model.slug == base)
+            conditions.append(model.slug.like(f"{_escape_like(base)}-%", escape="\\"))
+
+        # Hidden rows still hold their slugs.
+        stmt = (
+            select(model.slug)
+            .where(or_(*conditions))
+            .execution_options(include_deleted=True)
+        )
+        if exclude_id is not None:
+            stmt = stmt.where(model.id != exclude_id)
+
+        for slug in session.scalars(stmt):
+            if slug in taken:
+                taken[slug].add(0)
+            match = _SUFFIX_RE.fullmatch(slug)
+            if match and match.group(1) in taken:
+                taken[match.group(1)].add(int(match.group(2)))
+
+    return taken
+
+
+def unique_slugs(
+    session: Session, model, texts: Iterable[str], exclude_id: int | None = None
+) -> list[str]:
+    """Generate collision-free slugs for ``texts`` with one lookup per chunk.
+
+    Slugs are also kept distinct from each other, so a batch of identical
+    titles gets ``title``, ``title-1``, ``title-2``...
+    """
+    bases = [base_slug(model, text) for text in texts]
+    taken = _taken_suffixes(session, model, set(bases), exclude_id)
+
+    slugs = []
+    for base in bases:
+        used = taken[base]
+        suffix = max(used) + 1 if used else 0
+        used.add(suffix)
+        if not suffix:
+            slugs.append(base)
+            continue
+        # The base leaves SUFFIX_MAX_LENGTH free; this also covers longer ones.
+        tail = f"-{suffix}"
+        slugs.append(base[: SLUG_MAX_LENGTH - len(tail)] + tail)
+
+    return slugs
+
+
+def unique_slug(
+    session: Session, model, text: str, exclude_id: int | None = None
+) -> str:
+    return unique_slugs(session, model, [text], exclude_id)[0]
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from database import DB_POOL_SIZE, engine
+from services import (
+    auth,
+    author_stats,
+    compactor,
+    content,
+    counters,
+    devices,
+    live_feed,
+    reading_history,
+    related,
+    scheduler,
+    trending,
+)
+from weather.weather import TASHKENT_LAT, TASHKENT_LON, fetch_weather
+
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TIMEOUT = float(os.getenv("STARTUP_WARMUP_TIMEOUT", "10"))
+WARM_CONNECTIONS = int(os.getenv("STARTUP_WARM_CONNECTIONS", str(DB_POOL_SIZE)))
+
+
+def _warm_pool():
+    # Every thread holds its connection until all are open, so the pool ends
+    # up with WARM_CONNECTIONS distinct idle connections.
+    count = min(WARM_CONNECTIONS, DB_POOL_SIZE)
+    barrier = threading.Barrier(count, timeout=WARMUP_TIMEOUT)
+
+    def open_connection():
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+        except Exception:
+            barrier.abort()
+            raise
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(open_connection) for _ in range(count)]
+        for future in futures:
+            future.result()
+
+
+async def _run(name: str, coro) -> tuple[str, float, str | None]:
+    started = time.perf_counter()
+    try:
+        await coro
+        error = None
+    except Exception as exc:
+        logger.warning("startup warm-up %s failed: %s", name, exc)
+        error = str(exc)
+    return name, time.perf_counter() - started, error
+
+
+async def warm_up() -> dict:
+    """Warm the pool and snapshots concurrently; failures only get logged."""
+    tasks = [
+        _run("db_pool", run_in_threadpool(_warm_pool)),
+        _run("trending", run_in_threadpool(trending.refresh)),
+        _run("weather", fetch_weather(TASHKENT_LAT, TASHKENT_LON)),
+    ]
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*tasks), WARMUP_TIMEOUT)
+    except TimeoutError:
+        logger.warning("startup warm-up timed out after %ss", WARMUP_TIMEOUT)
+        return {}
+
+    return {
+        name: {"seconds": round(seconds, 4), "error": error}
+        for name, seconds, error in results
+    }
+
+
+def _register_jobs():
+    # Buffers live in each worker's memory, so every worker flushes its own.
+    scheduler.register(
+        "reading_history_flush",
+        reading_history.flush,
+        reading_history.HISTORY_FLUSH_INTERVAL,
+        leader=False,
+    )
+    scheduler.register(
+        "device_flush", devices.flush, devices.DEVICE_FLUSH_INTERVAL, leader=False
+    )
+    # The trending snapshot is per worker as well.
+    scheduler.register(
+        "trending_refresh", trending.refresh, trending.TRENDING_TTL, leader=False
+    )
+
+    scheduler.register("compactor", compactor.compact, compactor.COMPACTOR_INTERVAL)
+    scheduler.register(
+        "session_cleanup", auth.purge_expired_sessions, auth.SESSION_CLEANUP_INTERVAL
+    )
+    scheduler.register(
+        "related_rebuild", related.rebuild_all, related.RELATED_REBUILD_INTERVAL
+    )
+    scheduler.register(
+        "author_stats_refresh",
+        author_stats.refresh,
+        author_stats.AUTHOR_STATS_REFRESH_INTERVAL,
+    )
+    scheduler.register(
+        "post_count_reconcile", counters.reconcile, counters.RECONCILE_INTERVAL
+    )
+
+
+def start_background_tasks() -> list[asyncio.Task]:
+    _register_jobs()
+    return [asyncio.create_task(live_feed.run_listener()), *scheduler.start()]
+
+
+async def shutdown(tasks: list[asyncio.Task]):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await scheduler.stop()
+
+    try:
+        await run_in_threadpool(reading_history.flush)
+    except Exception:
+        logger.exception("final reading history flush failed")
+
+    try:
+        await run_in_threadpool(devices.flush)
+    except Exception:
+        logger.exception("final device flush failed")
+
+    await run_in_threadpool(content.shutdown)
+
+    await run_in_threadpool(engine.dispose)
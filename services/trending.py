@@ -0,0 +1,45 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import Post
+from services import response_cache
+from services.cache import TTLCache
+
+
+TRENDING_LIMIT = int(os.getenv("TRENDING_LIMIT", "5"))
+TRENDING_WINDOW_DAYS = int(os.getenv("TRENDING_WINDOW_DAYS", "7"))
+TRENDING_TTL = float(os.getenv("TRENDING_TTL", "300"))
+
+CACHE_KEY = "trending"
+
+_snapshot = TTLCache(maxsize=1, ttl=TRENDING_TTL)
+
+
+def _score():
+    return Post.views_count + 5 * Post.likes_count + 10 * Post.comments_count
+
+
+def refresh() -> list[dict]:
+    since = datetime.now(timezone.utc) - timedelta(days=TRENDING_WINDOW_DAYS)
+    stmt = (
+        select(Post.id, Post.title, Post.slug, Post.created_at)
+        .where(Post.is_active.is_(True), Post.created_at >= since)
+        .order_by(_score().desc(), Post.id.desc())
+        .limit(TRENDING_LIMIT)
+    )
+    with SessionLocal() as session:
+        posts = [row._asdict() for row in session.execute(stmt)]
+
+    _snapshot.set("posts", posts)
+    response_cache.invalidate(CACHE_KEY)
+    return posts
+
+
+def get_trending() -> list[dict]:
+    posts = _snapshot.get("posts")
+    if posts is None:
+        posts = refresh()
+    return posts
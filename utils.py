@@ -1,10 +1,16 @@
 import re
 import unicodedata
+from functools import lru_cache
 
 
+_NON_WORD_RE = re.compile(r"[^\w\s-]")
+_SEPARATOR_RE = re.compile(r"[-\s]+")
+
+
+@lru_cache(maxsize=4096)
 def generate_slug(text: str) -> str:
     text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
 
-    text = re.sub(r"[^\w\s-]", "", text).strip().lower()
+    text = _NON_WORD_RE.sub("", text).strip().lower()
 
-    return re.sub(r"[-\s]+", "-", text)
+    return _SEPARATOR_RE.sub("-", text)
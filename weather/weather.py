@@ -1,12 +1,40 @@
-from fastapi import APIRouter
+import os
+
+from fastapi import APIRouter, HTTPException
 import httpx
 
+from services.cache import TTLCache
+
+
 router = APIRouter()
 
+TASHKENT_LAT = 41.2995
+TASHKENT_LON = 69.2401
+WEATHER_TTL = float(os.getenv("WEATHER_TTL", "600"))
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", "5"))
 
-@router.get("/weather/")
-async def get_weather(lat: float, lon: float):
-    url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true"
-    async with httpx.AsyncClient() as client:
+_snapshots = TTLCache(maxsize=256, ttl=WEATHER_TTL)
+
+
+async def fetch_weather(lat: float, lon: float) -> dict:
+    key = (round(lat, 2), round(lon, 2))
+    data = _snapshots.get(key)
+    if data is not None:
+        return data
+
+    url = f"https://api.open-meteo.com/v1/forecast?latitude={key[0]}&longitude={key[1]}&current_weather=true"
+    async with httpx.AsyncClient(timeout=WEATHER_TIMEOUT) as client:
         response = await client.get(url)
-        return response.json()
+        response.raise_for_status()
+        data = response.json()
+
+    _snapshots.set(key, data)
+    return data
+
+
+@router.get("/weather/")
+async def get_weather(lat: float = TASHKENT_LAT, lon: float = TASHKENT_LON):
+    try:
+        return await fetch_weather(lat, lon)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Ob-havo ma'lumotini olib bo'lmadi")